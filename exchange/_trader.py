@@ -0,0 +1,263 @@
+"""Trader and metrics shared by the scoring metric (score.py), the trade generator
+(trade.py) and the engine (engine.py)."""
+from math import isnan
+from types import MappingProxyType
+
+import numpy as np
+from numba import njit
+
+DEFAULT_FEE = 0.0003  # 3 bps = 0.0003 = 0.03%
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+ANNUALIZATION_FACTOR = np.sqrt(MINUTES_PER_YEAR)
+EPSILON = 1e-9
+DEFAULT_RISK_FREE = 0.0
+
+# Integer codes resolved once outside the hot loop and used by the compiled step
+FIAT, TOKEN_1, TOKEN_2 = 0, 1, 2
+PAIR_T1F, PAIR_T2F, PAIR_T1T2 = 0, 1, 2
+SIDE_BUY, SIDE_SELL = 0, 1
+
+CURRENCIES = ("fiat", "token_1", "token_2")
+PAIRS = ("token_1/fiat", "token_2/fiat", "token_1/token_2")
+SIDE_CODES = {"buy": SIDE_BUY, "sell": SIDE_SELL}
+
+# Pair name -> (pair code, base currency, quote currency), resolved with one lookup
+PAIR_TABLE = {
+    "token_1/fiat": (PAIR_T1F, TOKEN_1, FIAT),
+    "token_2/fiat": (PAIR_T2F, TOKEN_2, FIAT),
+    "token_1/token_2": (PAIR_T1T2, TOKEN_1, TOKEN_2),
+}
+PAIR_CODES = {name: code for name, (code, _, _) in PAIR_TABLE.items()}
+
+# Base and quote currency of each pair, indexed by pair code
+PAIR_BASE = tuple(base for _, base, _ in PAIR_TABLE.values())
+PAIR_QUOTE = tuple(quote for _, _, quote in PAIR_TABLE.values())
+
+
+def fiat_prices(prices: np.ndarray) -> np.ndarray:
+    """Fiat value of one unit of each currency from the pair prices.
+
+    token_2 is valued through token_1/fiat and token_1/token_2 when token_2/fiat
+    is missing; currencies without a usable price are valued at 0.
+    """
+    t1_fiat, t2_fiat, t1_t2 = prices
+    if np.isnan(t2_fiat):
+        t2_fiat = t1_fiat / t1_t2
+    return np.nan_to_num(np.array([1.0, t1_fiat, t2_fiat]))
+
+
+@njit(cache=True)
+def step(balances, prices, fee, buy_mult, sell_mult, pair, side, qty, base_idx, quote_idx):
+    """Execute one order in place on the balance array.
+
+    buy_mult and sell_mult are 1 + fee and 1 - fee, precomputed by the trader.
+    Returns (executed, turnover delta, fee delta).
+    """
+    price = prices[pair]
+    if np.isnan(price):
+        return False, 0.0, 0.0  # Can't trade without a price
+
+    notional = qty * price
+
+    if side == SIDE_BUY:
+        # Check if we have enough of the quote currency to cover cost plus fee
+        total_cost = notional * buy_mult
+        if balances[quote_idx] >= total_cost:
+            balances[quote_idx] -= total_cost
+            balances[base_idx] += qty
+            return True, total_cost, notional * fee
+
+    elif side == SIDE_SELL:
+        # Check if we have enough of the base currency
+        if balances[base_idx] >= qty:
+            balances[quote_idx] += notional * sell_mult
+            balances[base_idx] -= qty
+            return True, notional, notional * fee
+
+    return False, 0.0, 0.0
+
+
+@njit(cache=True)
+def equity_stats(equity, risk_free=DEFAULT_RISK_FREE):
+    """Sharpe ratio of the equity returns and max drawdown, in a single pass.
+
+    Accumulates in float64 whatever the storage dtype of the equity curve.
+    """
+    rf = risk_free / MINUTES_PER_YEAR  # per‑minute rf
+    prev = np.float64(equity[0])
+    hwm = prev
+    mdd = 0.0
+    mean = 0.0
+    m2 = 0.0
+    n = equity.shape[0] - 1
+    for i in range(1, equity.shape[0]):
+        v = np.float64(equity[i])
+        r = (v - prev) / prev - rf
+        prev = v
+        # Welford update of the running mean / sum of squared deviations
+        delta = r - mean
+        mean += delta / i
+        m2 += delta * (r - mean)
+        if v > hwm:
+            hwm = v
+        dd = (v - hwm) / hwm
+        if dd < mdd:
+            mdd = dd
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    return ANNUALIZATION_FACTOR * mean / (std + EPSILON), mdd
+
+
+def initial_portfolio_value(balances, prices: np.ndarray) -> float:
+    """Fiat value of {currency: amount} balances at the fiat pair prices (NaN if never seen).
+
+    Used for the initial value at each pair's first price and for the HODL
+    value at the last prices.
+    """
+    value = balances["fiat"]
+    if not isnan(prices[PAIR_T1F]) and balances["token_1"] > 0:
+        value += balances["token_1"] * prices[PAIR_T1F]
+    if not isnan(prices[PAIR_T2F]) and balances["token_2"] > 0:
+        value += balances["token_2"] * prices[PAIR_T2F]
+    return value
+
+
+# --- Core Engine ---------------------------------------------------------
+
+class Trader:
+    """Trader supporting multiple trading pairs and currencies.
+
+    Balances and prices are float arrays indexed by the currency and pair
+    codes above (NaN marks a pair without a price yet). The portfolio value
+    is kept in ``equity`` and patched on every price update or fill, using
+    the cached fiat value of one unit of each currency. ``balances`` is a live
+    read-only {currency: amount} view that fills update in place, so it can be
+    handed to a strategy every timestamp without building a dict.
+    """
+
+    __slots__ = (
+        "_balances", "_balance_amounts", "_balance_view",
+        "_fee", "_buy_mult", "_sell_mult",
+        "prices", "_unit", "equity", "first_prices", "_seen_mask",
+        "equity_history", "turnover", "trade_count", "total_fees_paid",
+    )
+
+    def __init__(self, balances=None, fee=DEFAULT_FEE):
+        # Initialize balances for each currency
+        self._balances = np.zeros(len(CURRENCIES))
+        self._balance_amounts = dict.fromkeys(CURRENCIES, 0.0)
+        self._balance_view = MappingProxyType(self._balance_amounts)
+        self.fee = fee
+
+        # Track market prices for each pair
+        self.prices = np.full(len(PAIRS), np.nan)
+
+        # Fiat value of one unit of each currency (0 while unpriced)
+        self._unit = fiat_prices(self.prices)
+        self.equity = 0.0
+        if balances is not None:
+            self.balances = balances
+
+        # First and last prices for reporting
+        self.first_prices = np.full(len(PAIRS), np.nan)
+
+        # Bit per pair code, set once the pair has had its first update
+        self._seen_mask = 0
+
+        # Track portfolio value history
+        self.equity_history = []
+        self.turnover = 0.0
+        self.trade_count = 0
+        self.total_fees_paid = 0.0  # Track total fees paid
+
+    @property
+    def fee(self):
+        """Trading fee as a decimal (e.g., 0.0003 = 3 bps)"""
+        return self._fee
+
+    @fee.setter
+    def fee(self, fee):
+        # Precompute the cost/proceeds multipliers whenever the fee changes
+        self._fee = fee
+        self._buy_mult = 1.0 + fee
+        self._sell_mult = 1.0 - fee
+
+    @property
+    def balances(self):
+        """Live read-only view of the balances as {currency: amount}; copy it to keep a snapshot"""
+        return self._balance_view
+
+    @balances.setter
+    def balances(self, balances):
+        self._balances[:] = [balances[name] for name in CURRENCIES]
+        self._balance_amounts.update(zip(CURRENCIES, self._balances.tolist()))
+        self.equity = float(np.dot(self._balances, self._unit))
+
+    def update_market(self, pair, close):
+        """Update market prices for a specific trading pair and record the equity"""
+        self.set_price(pair, close)
+        self.equity_history.append(self.equity)
+
+    def set_price(self, pair, close):
+        """Store the latest close of a pair and re-value the portfolio"""
+        idx = PAIR_CODES[pair]
+        prices = self.prices
+
+        # Store the updated price
+        prices[idx] = close
+
+        # Store first price for each pair (for reporting)
+        bit = 1 << idx
+        if not self._seen_mask & bit:
+            self.first_prices[idx] = close
+            self._seen_mask |= bit
+
+        # Re-value only the currencies this pair prices (token_2 falls back
+        # to token_1/fiat over token_1/token_2 while token_2/fiat is missing)
+        if idx == PAIR_T1F:
+            self._revalue(TOKEN_1, close)
+            if isnan(prices[PAIR_T2F]):
+                self._revalue(TOKEN_2, close / prices[PAIR_T1T2])
+        elif idx == PAIR_T2F:
+            self._revalue(TOKEN_2, close)
+        elif isnan(prices[PAIR_T2F]):
+            self._revalue(TOKEN_2, prices[PAIR_T1F] / close)
+
+    def _revalue(self, currency, unit):
+        # Patch equity by the holding's change in value
+        if isnan(unit):
+            unit = 0.0
+        self.equity += self._balances[currency] * (unit - self._unit[currency])
+        self._unit[currency] = unit
+
+    def execute(self, order):
+        """Execute a trading order across any supported pair"""
+        pair, base, quote = PAIR_TABLE[order["pair"]]
+        side = SIDE_CODES.get(order["side"], -1)  # Unknown sides are ignored by the step
+        self._execute(pair, side, float(order["qty"]), base, quote)
+
+    def execute_codes(self, pair, side, qty):
+        """Execute an order given as integer pair/side codes"""
+        self._execute(pair, side, qty, PAIR_BASE[pair], PAIR_QUOTE[pair])
+
+    def _execute(self, pair, side, qty, base, quote):
+        executed, turnover, fee_amount = step(
+            self._balances, self.prices, self._fee, self._buy_mult, self._sell_mult, pair, side, qty, base, quote
+        )
+
+        # Track turnover and fees, and count successful trades
+        if executed:
+            # Mirror the two currencies that changed into the balances view
+            amounts = self._balance_amounts
+            amounts[CURRENCIES[base]] = float(self._balances[base])
+            amounts[CURRENCIES[quote]] = float(self._balances[quote])
+
+            # Patch equity with the value of what changed hands
+            unit = self._unit
+            if side == SIDE_BUY:
+                self.equity += qty * unit[base] - turnover * unit[quote]
+            else:
+                self.equity += (turnover - fee_amount) * unit[quote] - qty * unit[base]
+            self.turnover += turnover
+            self.total_fees_paid += fee_amount
+            self.trade_count += 1
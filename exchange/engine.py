@@ -1,28 +1,158 @@
 """CLI: python -m exchange.engine path/to/submission.tgz"""
 import argparse, importlib.util, time, tarfile, tempfile, sys, json, os
+import contextlib, hashlib, shutil, stat
+from collections.abc import Mapping
+from math import isfinite, isnan
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 import pandas as pd
 
+try:
+    import orjson  # optional, faster result serialization
+except ImportError:
+    orjson = None
+
+from exchange._trader import DEFAULT_FEE, PAIR_CODES, PAIRS, equity_stats, initial_portfolio_value
+from exchange._trader import Trader as SharedTrader
+
 # --- Helpers -------------------------------------------------------------
 
-MINUTES_PER_YEAR = 365 * 24 * 60
-ANNUALIZATION_FACTOR = np.sqrt(MINUTES_PER_YEAR)
-EPSILON = 1e-9
-DEFAULT_RISK_FREE = 0.0
-DEFAULT_FEE = 0.0003 # 3 bps = 0.0003 = 0.03%
+MARKET_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+EQUITY_DTYPE = np.float32  # equity curve storage; balances and metrics stay float64
 
-def sharpe(returns: np.ndarray, risk_free: float = DEFAULT_RISK_FREE):
-    excess = returns - risk_free / MINUTES_PER_YEAR  # per‑minute rf
-    return ANNUALIZATION_FACTOR * excess.mean() / (excess.std(ddof=1) + EPSILON)
+def read_market_data(path: str) -> pd.DataFrame:
+    """Read only the OHLCV columns used by the engine from a parquet file"""
+    return pd.read_parquet(path, columns=MARKET_COLUMNS, engine="pyarrow")
 
-def max_drawdown(equity: np.ndarray):
-    cummax = np.maximum.accumulate(equity)
-    dd = (equity - cummax) / cummax
-    return dd.min()
+def dump_json(obj) -> str:
+    """Serialize results as indented JSON, with orjson when it is installed.
+    
+    NaN and infinite floats (e.g. the Sharpe ratio of a flat equity curve) are
+    written as null on both paths; orjson always does so, the stdlib would
+    write non-standard NaN/Infinity tokens.
+    """
+    obj = null_non_finite(obj)
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2, allow_nan=False)
+
+def null_non_finite(obj):
+    """Copy of nested dicts/lists with NaN and infinite floats replaced by None"""
+    root = [obj]
+    stack = [(root, 0, obj)]
+    while stack:
+        parent, key, value = stack.pop()
+        if isinstance(value, dict):
+            value = parent[key] = dict(value)
+            stack.extend((value, k, v) for k, v in value.items())
+        elif isinstance(value, (list, tuple)):
+            value = parent[key] = list(value)
+            stack.extend((value, i, v) for i, v in enumerate(value))
+        elif isinstance(value, float) and not isfinite(value):
+            parent[key] = None
+    return root[0]
+
+def format_numbers(obj):
+    """Round all float values in nested dicts/lists to 4 decimal places, in place"""
+    # Iterative walk so deep or long structures can't hit the recursion limit
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        for key, value in (node.items() if isinstance(node, dict) else enumerate(node)):
+            if isinstance(value, float):
+                node[key] = round(value, 4)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    return obj
 
 # --- Core Engine ---------------------------------------------------------
 
+class Tick(Mapping):
+    """Market data for one pair at one timestamp, as passed to strategies.
+
+    A read-only mapping with the keys of the row dicts strategies used to get
+    (timestamp, open, high, low, close, volume, pair and fee), so
+    ``tick["close"]``, ``tick.get("fee")``, ``dict(tick)`` and ``tick.items()``
+    keep working; timestamp is the pandas value of the row, as before.
+
+    The engine reuses one instance per pair and overwrites it every
+    timestamp, so a strategy that keeps a tick sees it change on the next
+    call; use ``tick.copy()`` to keep a snapshot.
+    """
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume", "pair", "fee")
+
+    def __init__(self, pair, fee):
+        self.timestamp = None
+        self.open = None
+        self.high = None
+        self.low = None
+        self.close = None
+        self.volume = None
+        self.pair = pair
+        self.fee = fee
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def copy(self):
+        """Snapshot of the tick as a plain dict"""
+        return dict(self.items())
+
+def merge_pairs(data_dict: dict) -> dict:
+    """Merge per-pair market data into timestamp-ordered column arrays.
+
+    Each pair's rows are already sorted, so a stable sort over the
+    concatenated runs behaves like a k-way merge, and no combined
+    DataFrame is built.
+    """
+    frames = {pair: df for pair, df in data_dict.items() if not df.empty}
+    if not frames:
+        return {col: np.empty(0) for col in ["pair", *MARKET_COLUMNS]}
+
+    ts = np.concatenate([df['timestamp'].to_numpy() for df in frames.values()])
+    order = np.argsort(ts, kind="stable")
+
+    pairs = np.array(list(frames), dtype=object)
+    merged = {
+        "pair": np.repeat(pairs, [len(df) for df in frames.values()])[order],
+        "timestamp": ts[order],
+    }
+    for col in MARKET_COLUMNS:
+        if col not in merged:
+            merged[col] = np.concatenate([df[col].to_numpy() for df in frames.values()])[order]
+    return merged
+
+def load_strategy(submission_dir: Path):
+    """Import `strategy.main` from a submission directory.
+    
+    Strategy modules imported by an earlier run are dropped first, so several
+    submissions can be backtested in the same process (e.g. a sweep worker).
+    """
+    # Keep the submission first on sys.path without growing it on repeated runs
+    path = str(submission_dir)
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+    
+    for name in [m for m in sys.modules if m == "strategy" or m.startswith("strategy.")]:
+        del sys.modules[name]
+    return importlib.import_module("strategy.main")
+
 def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
     """Run a backtest with multiple trading pairs.
     
@@ -31,8 +161,8 @@ def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
         data_dict: Dictionary of {pair: dataframe} containing market data for each pair
         trader: Optional custom trader instance with initial balances
     """
-    sys.path.insert(0, str(submission_dir))
-    strat_mod = importlib.import_module("strategy.main")
+    strat_mod = load_strategy(submission_dir)
+    on_data = strat_mod.on_data
     
     # Initialize multi-asset trader if not provided
     if trader is None:
@@ -42,58 +172,81 @@ def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
     initial_balances = trader.balances.copy()
     
     # Initialize prices with first data point for each pair
-    first_prices = {}
+    first_prices = np.full(len(PAIRS), np.nan)
     for pair, df in data_dict.items():
         if not df.empty:
-            first_prices[pair] = df.iloc[0]['close']
+            first_prices[PAIR_CODES[pair]] = df['close'].iat[0]
     
     # Calculate true initial portfolio value including all assets
-    initial_portfolio_value = initial_balances["fiat"]
-    if "token_1/fiat" in first_prices and initial_balances["token_1"] > 0:
-        initial_portfolio_value += initial_balances["token_1"] * first_prices["token_1/fiat"]
-    if "token_2/fiat" in first_prices and initial_balances["token_2"] > 0:
-        initial_portfolio_value += initial_balances["token_2"] * first_prices["token_2/fiat"]
-    
-    # Start equity history with correct initial portfolio value
-    trader.equity_history = [initial_portfolio_value]
-    
-    # Combine all dataframes and sort by timestamp
-    all_data = []
-    for pair, df in data_dict.items():
-        df = df.copy()
-        df['pair'] = pair
-        all_data.append(df)
-    
-    combined_data = pd.concat(all_data)
-    combined_data = combined_data.sort_values('timestamp')
+    initial_value = initial_portfolio_value(initial_balances, first_prices)
     
+    # Merge all pairs into timestamp-ordered column arrays
+    merged = merge_pairs(data_dict)
+
+    # Rows are sorted, so each timestamp is a contiguous run starting where the value changes
+    ts_arr = merged['timestamp']
+    starts = np.flatnonzero(np.r_[len(ts_arr) > 0, ts_arr[1:] != ts_arr[:-1]])
+    ends = np.r_[starts[1:], len(ts_arr)]
+
+    # Start equity history with correct initial portfolio value, one slot per timestamp
+    trader.reset_equity(len(starts), initial_value)
+
+    # Bind the column arrays once instead of building a dict per row in the loop;
+    # ticks get the timestamps as pandas values (e.g. Timestamp), like row dicts did
+    tick_ts = pd.Series(ts_arr).tolist()
+    pair_arr = merged['pair']
+    open_arr = merged['open']
+    high_arr = merged['high']
+    low_arr = merged['low']
+    close_arr = merged['close']
+    volume_arr = merged['volume']
+
+    # One reusable tick per pair; fee is included so strategies can access it
+    ticks = {pair: Tick(pair, trader.fee) for pair in data_dict}
+
+    # Bind the per-row trader methods to locals to skip attribute lookups in the loop
+    set_price = trader.set_price
+    snapshot_equity = trader.snapshot_equity
+    execute = trader.execute
+    balances = trader.balances  # live view, kept current by the fills
+
     # Process data timestamp by timestamp
-    for timestamp, group in combined_data.groupby('timestamp'):
+    for start, end in zip(starts.tolist(), ends.tolist()):
         # Update prices for each pair in this timestamp
         market_data = {}
-        for _, row in group.iterrows():
-            pair = row['pair']
-            trader.update_market(pair, row.to_dict())
-            data_dict = row.to_dict()
-            # Add fee information to market data so strategies can access it
-            data_dict["fee"] = trader.fee
-            market_data[pair] = data_dict
+        for i in range(start, end):
+            pair = pair_arr[i]
+            close = close_arr[i]
+            set_price(pair, close)
+
+            tick = ticks[pair]
+            tick.timestamp = tick_ts[i]
+            tick.open = open_arr[i]
+            tick.high = high_arr[i]
+            tick.low = low_arr[i]
+            tick.close = close
+            tick.volume = volume_arr[i]
+            market_data[pair] = tick
+
+        # Value the portfolio once all prices for this timestamp are in
+        snapshot_equity()
         
         # Get strategy decision based on all available market data and current balances
-        actions = strat_mod.on_data(market_data, trader.balances)
+        actions = on_data(market_data, balances)
 
         if actions is None:
             continue
 
         # Execute action if any
         for action in actions:
-            trader.execute(action)
+            execute(action)
     
     # Calculate performance metrics
-    equity_curve = np.array(trader.equity_history)
-    rets = np.diff(equity_curve) / equity_curve[:-1]
-    initial_equity = equity_curve[0]
-    final_equity = equity_curve[-1]
+    equity_curve = trader.equity_history[:trader.equity_idx]
+    sharpe_ratio, max_dd = equity_stats(equity_curve)
+    # Take PnL from the float64 valuations rather than the float32 curve
+    initial_equity = initial_value
+    final_equity = trader.last_snapshot
     absolute_pnl = final_equity - initial_equity
     percentage_pnl = (absolute_pnl / initial_equity) * 100
     
@@ -102,18 +255,10 @@ def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
     final_fiat_value = final_equity
     
     # Store current prices for result reporting
-    current_prices = {
-        "token_1/fiat": trader.prices.get("token_1/fiat"),
-        "token_2/fiat": trader.prices.get("token_2/fiat"),
-        "token_1/token_2": trader.prices.get("token_1/token_2")
-    }
+    current_prices = price_dict(trader.prices)
     
     # Calculate what the value would be if we had simply held the initial assets
-    hodl_value = initial_balances["fiat"]
-    if trader.prices["token_1/fiat"] is not None and initial_balances["token_1"] > 0:
-        hodl_value += initial_balances["token_1"] * trader.prices["token_1/fiat"]
-    if trader.prices["token_2/fiat"] is not None and initial_balances["token_2"] > 0:
-        hodl_value += initial_balances["token_2"] * trader.prices["token_2/fiat"]
+    hodl_value = initial_portfolio_value(initial_balances, trader.prices)
     
     # Calculate HODL performance
     hodl_absolute_pnl = hodl_value - initial_equity
@@ -121,15 +266,15 @@ def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
     
     # Return results
     return {
-        "sharpe": sharpe(rets),
-        "max_dd": max_drawdown(equity_curve),
+        "sharpe": sharpe_ratio,
+        "max_dd": max_dd,
         "turnover": trader.turnover,
         "absolute_pnl": absolute_pnl,
         "percentage_pnl": percentage_pnl,
         "initial_equity": initial_equity,
         "final_equity": final_equity,
         "initial_balances": initial_balances,
-        "final_balances": trader.balances,
+        "final_balances": trader.balances.copy(),
         "initial_fiat_value": initial_fiat_value,
         "final_fiat_value": final_fiat_value,
         "total_fees_paid": trader.total_fees_paid,
@@ -138,140 +283,260 @@ def run_backtest(submission_dir: Path, data_dict: dict, trader=None):
         "hodl_absolute_pnl": hodl_absolute_pnl,
         "hodl_percentage_pnl": hodl_percentage_pnl,
         "hodl_value": hodl_value,
-        "equity_curve": equity_curve.tolist(),
+        "equity_curve": equity_curve,
     }
 
-class Trader:
-    """Trader supporting multiple trading pairs and currencies."""
-    def __init__(self):
-        # Initialize balances for each currency
-        self.balances = {"fiat": 0.0, "token_1": 0.0, "token_2": 0.0}
-        
-        # Track market prices for each pair
-        self.prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
-        
-        # First and last prices for reporting
-        self.first_prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
-        
-        # Store the first update timestamp for each pair
-        self.first_update = {
-            "token_1/fiat": False,
-            "token_2/fiat": False,
-            "token_1/token_2": False
-        }
-        
-        # Track portfolio value history
-        self.equity_history = 0.0
-        self.turnover = 0.0
-        self.trade_count = 0
-        self.total_fees_paid = 0.0  # Track total fees paid
-        
-        # Trading fee
-        self.fee = DEFAULT_FEE
+class Trader(SharedTrader):
+    """Shared trader that keeps one float32 equity snapshot per timestamp.
+
+    Prices still re-value the portfolio as they arrive (set_price), but the
+    equity history is preallocated by reset_equity and only written by
+    snapshot_equity, once all prices for a timestamp are in.
+    """
+    __slots__ = ("equity_idx", "last_snapshot")
+
+    def __init__(self, balances=None, fee=DEFAULT_FEE):
+        super().__init__(balances, fee)
+        self.equity_history = np.empty(0, dtype=EQUITY_DTYPE)
+        self.equity_idx = 0
+        self.last_snapshot = 0.0  # latest snapshot at full precision
+
+    def reset_equity(self, n, initial_value):
+        """Preallocate the equity history for n equity snapshots"""
+        self.equity_history = np.empty(n + 1, dtype=EQUITY_DTYPE)
+        self.equity_history[0] = initial_value
+        self.equity_idx = 1
+        self.last_snapshot = initial_value
+
+    def snapshot_equity(self):
+        """Append the current total portfolio value (in fiat) to the equity history"""
+        self.last_snapshot = self.equity
+        self.equity_history[self.equity_idx] = self.equity
+        self.equity_idx += 1
+
+def price_dict(prices: np.ndarray) -> dict:
+    """Pair prices (by pair code) as {pair: price} for reporting, None until the pair is seen"""
+    return {name: None if isnan(price) else float(price) for name, price in zip(PAIRS, prices)}
+
+# --- CLI --------------------------------------------------------------
+
+# Extracted submissions are cached per user; a shared directory such as /tmp
+# would let another user plant code under an archive's cache key. The location
+# can be overridden with EXCHANGE_SUBMISSION_CACHE.
+SUBMISSION_CACHE = Path(
+    os.environ.get("EXCHANGE_SUBMISSION_CACHE")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "exchange" / "submissions"
+)
+SUBMISSION_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds an extraction may go unused before it is evicted
+
+def submission_cache_dir() -> Path:
+    """Create the submission cache directory if needed and check it is private.
     
-    def update_market(self, pair, price_data):
-        """Update market prices for a specific trading pair"""
-        # Store the updated price
-        self.prices[pair] = price_data["close"]
-        
-        # Store first price for each pair (for reporting)
-        if not self.first_update[pair]:
-            self.first_prices[pair] = price_data["close"]
-            self.first_update[pair] = True
-        
-        # Calculate total portfolio value (in fiat)
-        equity = self.calculate_portfolio_value()
-        self.equity_history.append(equity)
+    Raises:
+        PermissionError: If the directory is a symlink or belongs to another user
+    """
+    SUBMISSION_CACHE.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(SUBMISSION_CACHE)
+    if not stat.S_ISDIR(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+        raise PermissionError(f"{SUBMISSION_CACHE} is not a directory owned by the current user")
+    if st.st_mode & 0o077:
+        os.chmod(SUBMISSION_CACHE, 0o700)
+    return SUBMISSION_CACHE
+
+def prune_submission_cache(cache: Path, max_age: float = SUBMISSION_CACHE_MAX_AGE):
+    """Remove extractions (and leftover staging directories) unused for max_age seconds"""
+    cutoff = time.time() - max_age
+    for entry in cache.glob("sub-*"):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+        except FileNotFoundError:
+            pass  # Removed by a concurrent prune
+
+def _extract_archive(archive: str, path: Path):
+    with tarfile.open(archive) as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(path=path, filter="data")
+        else:
+            tar.extractall(path=path)
+
+def extract_submission(archive: str, into: Path | None = None) -> Path:
+    """Extract a submission archive, by default into a cache keyed by its content hash.
     
-    def calculate_portfolio_value(self):
-        """Calculate total portfolio value in fiat currency"""
-        value = self.balances["fiat"]
-        
-        # Add token_1 value if we have price data
-        if self.prices["token_1/fiat"] is not None:
-            value += self.balances["token_1"] * self.prices["token_1/fiat"]
-        
-        # Add token_2 value if we have price data
-        if self.prices["token_2/fiat"] is not None:
-            value += self.balances["token_2"] * self.prices["token_2/fiat"]
-        # If token_2/fiat price not available but token_1/fiat and token_1/token_2 are available
-        elif self.prices["token_1/fiat"] is not None and self.prices["token_1/token_2"] is not None:
-            token2_value_in_token1 = self.balances["token_2"] / self.prices["token_1/token_2"]
-            value += token2_value_in_token1 * self.prices["token_1/fiat"]
-        
-        return value
+    Evaluating the same archive again (e.g. across sweep workers or repeated
+    runs) reuses the earlier extraction instead of unpacking it every time;
+    extractions unused for SUBMISSION_CACHE_MAX_AGE are evicted. Pass into to
+    extract into that directory instead, bypassing the cache.
+    """
+    if into is not None:
+        _extract_archive(archive, into)
+        return into
+    
+    digest = hashlib.sha256()
+    with open(archive, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    cache = submission_cache_dir()
+    prune_submission_cache(cache)
+    target = cache / f"sub-{digest.hexdigest()}"
+    if target.is_dir():
+        os.utime(target)  # Mark as used so it isn't evicted
+        return target
+    
+    # Extract into a staging directory and move it into place, so neither
+    # concurrent workers nor later runs see a partially extracted tree
+    staging = Path(tempfile.mkdtemp(prefix=f"{target.name}-", dir=cache))
+    try:
+        _extract_archive(archive, staging)
+        os.replace(staging, target)
+    except OSError:
+        # Another process extracted the same archive first
+        shutil.rmtree(staging, ignore_errors=True)
+        if not target.is_dir():
+            raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+@contextlib.contextmanager
+def submission_dir(archive: str, cache: bool = True):
+    """Directory holding the extracted submission, cached or removed on exit"""
+    if cache:
+        yield extract_submission(archive)
+        return
+    with tempfile.TemporaryDirectory() as td:
+        yield extract_submission(archive, Path(td))
+
+def evaluate(submission: str, data_dict: dict, balances: dict, fee: float, equity_path: str | None = None, cache: bool = True) -> dict:
+    """Backtest and score a single submission archive.
+    
+    Args:
+        submission: Path to the submission .tgz archive
+        data_dict: Dictionary of {pair: dataframe} containing market data for each pair
+        balances: Dictionary of {currency: amount} containing initial balances
+        fee: Trading fee as a decimal (e.g., 0.0002 = 2 bps)
+        equity_path: Optional .npy path to save the equity curve to
+        cache: Reuse the cached extraction of the archive (see extract_submission)
+    
+    Returns:
+        Dictionary of grouped and rounded results, ready to be printed
+    """
+    # Create Trader
+    trader = Trader()
+    trader.balances = dict(balances)
+    trader.fee = fee
+    
+    # Update the run_backtest function to use our custom trader
+    with submission_dir(submission, cache) as submission_root:
+        res = run_backtest(submission_root / "submission", data_dict, trader=trader)
     
-    def execute(self, order):
-        """Execute a trading order across any supported pair"""
-        pair = order["pair"]  # e.g., "token_1/fiat"
-        side = order["side"]  # "buy" or "sell"
-        qty = float(order["qty"])
+    # Calculate score components
+    sharpe_component = 0.7 * res["sharpe"]
+    drawdown_component = 0.2 * abs(res["max_dd"])
+    turnover_component = 0.1 * (res["turnover"] / 1e6)
+    
+    # Calculate final score
+    score = sharpe_component - drawdown_component - turnover_component
+    
+    # Add score components to the results
+    res["score_components"] = {
+        "sharpe_contribution": sharpe_component,
+        "drawdown_penalty": drawdown_component,
+        "turnover_penalty": turnover_component
+    }
+    res["score"] = score
+    
+    # Create a copy of results without the equity curve for display
+    display_res = res.copy()
+    equity_curve = display_res.pop("equity_curve", None)
+    if equity_path is not None:
+        np.save(equity_path, equity_curve)
+    
+    # Create ordered dictionary with a logical grouping of metrics
+    ordered_res = {
+        # Top-level performance metric
+        "score": display_res.pop("score"),
         
-        # Split the pair into base and quote currencies
-        base, quote = pair.split("/")
+        # PnL metrics - keeping a copy of initial_equity for HODL
+        "pnl": {
+            "absolute": display_res.pop("absolute_pnl"),
+            "percentage": display_res.pop("percentage_pnl"),
+            "initial_equity": display_res["initial_equity"],
+            "final_equity": display_res.pop("final_equity")
+        },
         
-        # Get current price for the pair
-        price = self.prices[pair]
-        if price is None:
-            return  # Can't trade without a price
+        # Balances
+        "balances": {
+            "initial": {
+                **display_res.pop("initial_balances"),
+                "total_in_fiat": display_res.pop("initial_fiat_value")
+            },
+            "final": {
+                **display_res.pop("final_balances"),
+                "total_in_fiat": display_res.pop("final_fiat_value")
+            }
+        },
         
-        executed = False
+        # Market prices
+        "prices": {
+            "initial": price_dict(trader.first_prices),
+            "final": display_res.pop("current_prices")
+        },
         
-        if side == "buy":
-            # Calculate total cost including fee
-            base_cost = qty * price
-            fee_amount = base_cost * self.fee
-            total_cost = base_cost + fee_amount
-            
-            # Check if we have enough of the quote currency
-            if self.balances[quote] >= total_cost:
-                # Deduct quote currency (e.g., fiat)
-                self.balances[quote] -= total_cost
-                
-                # Add base currency (e.g., token_1)
-                self.balances[base] += qty
-                
-                # Track turnover and fees
-                self.turnover += total_cost
-                self.total_fees_paid += fee_amount
-                executed = True
+        # Trading activity and performance metrics
+        "trading": {
+            "sharpe": display_res.pop("sharpe"),
+            "max_drawdown": display_res.pop("max_dd"),
+            "turnover": display_res.pop("turnover"),
+            "trade_count": display_res.pop("trade_count"),
+            "total_fees_paid": display_res.pop("total_fees_paid"),
+        },
         
-        elif side == "sell":
-            # Check if we have enough of the base currency
-            if self.balances[base] >= qty:
-                # Calculate proceeds after fee
-                base_proceeds = qty * price
-                fee_amount = base_proceeds * self.fee
-                net_proceeds = base_proceeds - fee_amount
-                
-                # Add quote currency (e.g., fiat)
-                self.balances[quote] += net_proceeds
-                
-                # Deduct base currency (e.g., token_1)
-                self.balances[base] -= qty
-                
-                # Track turnover and fees
-                self.turnover += base_proceeds
-                self.total_fees_paid += fee_amount
-                executed = True
+        # HODL comparison
+        "hodl_pnl": {
+            "absolute": display_res.pop("hodl_absolute_pnl"),
+            "percentage": display_res.pop("hodl_percentage_pnl"),
+            "initial_equity": display_res.pop("initial_equity"),
+            "final_equity": display_res.pop("hodl_value")
+        },
         
-        # Count successful trades
-        if executed:
-            self.trade_count += 1
+        # Score breakdown
+        "score_components": display_res.pop("score_components")
+    }
+    
+    # Format all numeric values to 4 decimal places
+    return format_numbers(ordered_res)
 
-# --- CLI --------------------------------------------------------------
+# Market data shared by every task of a sweep worker, set once by _init_worker
+_worker_data = None
+
+def _init_worker(data_dict):
+    global _worker_data
+    _worker_data = data_dict
+
+def _evaluate_in_worker(submission, balances, fee, cache):
+    return evaluate(submission, _worker_data, balances, fee, cache=cache)
+
+def run_many(submissions: list, data_dict: dict, balances: dict, fee: float, workers: int | None = None, cache: bool = True) -> list:
+    """Backtest several submissions in parallel, one process per worker.
+    
+    The market data is loaded once by the caller and shipped to each worker
+    when it starts, rather than once per submission. Each backtest still runs
+    sequentially inside its worker; only independent submissions are spread
+    across cores.
+    
+    Returns:
+        List of results in the same order as submissions
+    """
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(data_dict,)) as pool:
+        futures = [pool.submit(_evaluate_in_worker, sub, balances, fee, cache) for sub in submissions]
+        return [f.result() for f in futures]
 
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("submission")
+    p.add_argument("submission", nargs="+", help="Path(s) to submission archives")
     p.add_argument("--token1fiat", help="Path to token_1/fiat data", default="data/token1fiat_1m.parquet")
     p.add_argument("--token2fiat", help="Path to token_2/fiat data", default="data/token2fiat_1m.parquet")
     p.add_argument("--token1token2", help="Path to token_1/token_2 data", default="data/token1token2_1m.parquet")
@@ -279,134 +544,51 @@ def main():
     p.add_argument("--token2_balance", help="Initial token_2 balance", type=float, default=0.0)
     p.add_argument("--fiat_balance", help="Initial fiat balance", type=float, default=10000.0)
     p.add_argument("--fee", help="Trading fee (in basis points, e.g., 2 = 0.02%)", type=float, default=2.0)
+    p.add_argument("--sweep", help="Backtest all submissions in parallel worker processes", action="store_true")
+    p.add_argument("--workers", help="Number of sweep worker processes (default: CPU count)", type=int, default=None)
+    p.add_argument("--save-equity", help="Save the equity curve to this .npy file", default=None)
+    p.add_argument("--no-cache", help="Extract submissions into a temporary directory instead of the cache", action="store_true")
     args = p.parse_args()
     
+    if args.save_equity and len(args.submission) > 1:
+        p.error("--save-equity requires a single submission")
+    
     # Load data for each available pair
     data_dict = {}
     
     if os.path.exists(args.token1fiat):
-        data_dict["token_1/fiat"] = pd.read_parquet(args.token1fiat)
+        data_dict["token_1/fiat"] = read_market_data(args.token1fiat)
     
     if os.path.exists(args.token2fiat):
-        data_dict["token_2/fiat"] = pd.read_parquet(args.token2fiat)
+        data_dict["token_2/fiat"] = read_market_data(args.token2fiat)
     
     if os.path.exists(args.token1token2):
-        data_dict["token_1/token_2"] = pd.read_parquet(args.token1token2)
+        data_dict["token_1/token_2"] = read_market_data(args.token1token2)
     
     if not data_dict:
         print("Error: No data files found. Please provide at least one valid data file.")
         sys.exit(1)
     
-    with tempfile.TemporaryDirectory() as td:
-        with tarfile.open(args.submission) as tar:
-            tar.extractall(path=td)
-            
-        # Create Trader
-        trader = Trader()
-        trader.balances = {
-            "fiat": args.fiat_balance,
-            "token_1": args.token1_balance,
-            "token_2": args.token2_balance
-        }
-        # Convert fee from basis points to decimal (e.g., 2 basis points = 0.0002)
-        trader.fee = args.fee / 10000
-        
-        # Reset the equity history - it will be properly initialized in run_multi_backtest
-        trader.equity_history = []
-        
-        # Update the run_backtest function to use our custom trader
-        res = run_backtest(Path(td) / "submission", data_dict, trader=trader)
-        
-        # Calculate score components
-        sharpe_component = 0.7 * res["sharpe"]
-        drawdown_component = 0.2 * abs(res["max_dd"])
-        turnover_component = 0.1 * (res["turnover"] / 1e6)
-        
-        # Calculate final score
-        score = sharpe_component - drawdown_component - turnover_component
-        
-        # Add score components to the results
-        res["score_components"] = {
-            "sharpe_contribution": sharpe_component,
-            "drawdown_penalty": drawdown_component,
-            "turnover_penalty": turnover_component
-        }
-        res["score"] = score
-        
-        # Create a copy of results without the equity curve for display
-        display_res = res.copy()
-        display_res.pop("equity_curve", None)
-        
-        # Create ordered dictionary with a logical grouping of metrics
-        ordered_res = {
-            # Top-level performance metric
-            "score": display_res.pop("score"),
-            
-            # PnL metrics - keeping a copy of initial_equity for HODL
-            "pnl": {
-                "absolute": display_res.pop("absolute_pnl"),
-                "percentage": display_res.pop("percentage_pnl"),
-                "initial_equity": display_res["initial_equity"],
-                "final_equity": display_res.pop("final_equity")
-            },
-            
-            # Balances
-            "balances": {
-                "initial": {
-                    **display_res.pop("initial_balances"),
-                    "total_in_fiat": display_res.pop("initial_fiat_value")
-                },
-                "final": {
-                    **display_res.pop("final_balances"),
-                    "total_in_fiat": display_res.pop("final_fiat_value")
-                }
-            },
-            
-            # Market prices
-            "prices": {
-                "initial": {
-                    "token_1/fiat": trader.first_prices.get("token_1/fiat"),
-                    "token_2/fiat": trader.first_prices.get("token_2/fiat"),
-                    "token_1/token_2": trader.first_prices.get("token_1/token_2")
-                },
-                "final": display_res.pop("current_prices")
-            },
-            
-            # Trading activity and performance metrics
-            "trading": {
-                "sharpe": display_res.pop("sharpe"),
-                "max_drawdown": display_res.pop("max_dd"),
-                "turnover": display_res.pop("turnover"),
-                "trade_count": display_res.pop("trade_count"),
-                "total_fees_paid": display_res.pop("total_fees_paid"),
-            },
-            
-            # HODL comparison
-            "hodl_pnl": {
-                "absolute": display_res.pop("hodl_absolute_pnl"),
-                "percentage": display_res.pop("hodl_percentage_pnl"),
-                "initial_equity": display_res.pop("initial_equity"),
-                "final_equity": display_res.pop("hodl_value")
-            },
-            
-            # Score breakdown
-            "score_components": display_res.pop("score_components")
-        }
-        
-        # Format all numeric values to 4 decimal places
-        def format_numbers(obj):
-            if isinstance(obj, dict):
-                return {k: format_numbers(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [format_numbers(item) for item in obj]
-            elif isinstance(obj, float):
-                # Round to 4 decimal places
-                return round(obj, 4)
-            else:
-                return obj
-        
-        formatted_res = format_numbers(ordered_res)
-        print(json.dumps(formatted_res, indent=2))
+    balances = {
+        "fiat": args.fiat_balance,
+        "token_1": args.token1_balance,
+        "token_2": args.token2_balance
+    }
+    # Convert fee from basis points to decimal (e.g., 2 basis points = 0.0002)
+    fee = args.fee / 10000
+    
+    if args.sweep:
+        results = run_many(args.submission, data_dict, balances, fee, workers=args.workers, cache=not args.no_cache)
+    else:
+        results = [
+            evaluate(sub, data_dict, balances, fee, equity_path=args.save_equity, cache=not args.no_cache)
+            for sub in args.submission
+        ]
+    
+    if len(results) == 1:
+        print(dump_json(results[0]))
+    else:
+        print(dump_json(dict(zip(args.submission, results))))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,156 +5,12 @@ import sys
 
 import numpy as np
 import pandas as pd
+import polars as pl
 
-# --- Helpers -------------------------------------------------------------
-
-MINUTES_PER_YEAR = 365 * 24 * 60
-ANNUALIZATION_FACTOR = np.sqrt(MINUTES_PER_YEAR)
-EPSILON = 1e-9
-DEFAULT_RISK_FREE = 0.0
-DEFAULT_FEE = 0.0003  # 3 bps = 0.0003 = 0.03%
-
-def sharpe(returns: np.ndarray, risk_free: float = DEFAULT_RISK_FREE):
-    excess = returns - risk_free / MINUTES_PER_YEAR  # per‑minute rf
-    return ANNUALIZATION_FACTOR * excess.mean() / (excess.std(ddof=1) + EPSILON)
-
-
-def max_drawdown(equity: np.ndarray):
-    cummax = np.maximum.accumulate(equity)
-    dd = (equity - cummax) / cummax
-    return dd.min()
-
-
-# --- Core Engine ---------------------------------------------------------
-
-class Trader:
-    """Trader supporting multiple trading pairs and currencies."""
-
-    def __init__(self):
-        # Initialize balances for each currency
-        self.balances = {"fiat": 0.0, "token_1": 0.0, "token_2": 0.0}
-
-        # Track market prices for each pair
-        self.prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
-
-        # First and last prices for reporting
-        self.first_prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
-
-        # Store the first update timestamp for each pair
-        self.first_update = {
-            "token_1/fiat": False,
-            "token_2/fiat": False,
-            "token_1/token_2": False
-        }
-
-        # Track portfolio value history
-        self.equity_history = 0.0
-        self.turnover = 0.0
-        self.trade_count = 0
-        self.total_fees_paid = 0.0  # Track total fees paid
-
-        # Trading fee
-        self.fee = DEFAULT_FEE
-
-    def update_market(self, pair, price_data):
-        """Update market prices for a specific trading pair"""
-        # Store the updated price
-        self.prices[pair] = price_data["close"]
-
-        # Store first price for each pair (for reporting)
-        if not self.first_update[pair]:
-            self.first_prices[pair] = price_data["close"]
-            self.first_update[pair] = True
-
-        # Calculate total portfolio value (in fiat)
-        equity = self.calculate_portfolio_value()
-        self.equity_history.append(equity)
-
-    def calculate_portfolio_value(self):
-        """Calculate total portfolio value in fiat currency"""
-        value = self.balances["fiat"]
-
-        # Add token_1 value if we have price data
-        if self.prices["token_1/fiat"] is not None:
-            value += self.balances["token_1"] * self.prices["token_1/fiat"]
-
-        # Add token_2 value if we have price data
-        if self.prices["token_2/fiat"] is not None:
-            value += self.balances["token_2"] * self.prices["token_2/fiat"]
-        # If token_2/fiat price not available but token_1/fiat and token_1/token_2 are available
-        elif self.prices["token_1/fiat"] is not None and self.prices["token_1/token_2"] is not None:
-            token2_value_in_token1 = self.balances["token_2"] / self.prices["token_1/token_2"]
-            value += token2_value_in_token1 * self.prices["token_1/fiat"]
-
-        return value
-
-    def execute(self, order):
-        """Execute a trading order across any supported pair"""
-        pair = order["pair"]  # e.g., "token_1/fiat"
-        side = order["side"]  # "buy" or "sell"
-        qty = float(order["qty"])
-
-        # Split the pair into base and quote currencies
-        base, quote = pair.split("/")
-
-        # Get current price for the pair
-        price = self.prices[pair]
-        if price is None:
-            return  # Can't trade without a price
-
-        executed = False
-
-        if side == "buy":
-            # Calculate total cost including fee
-            base_cost = qty * price
-            fee_amount = base_cost * self.fee
-            total_cost = base_cost + fee_amount
-
-            # Check if we have enough of the quote currency
-            if self.balances[quote] >= total_cost:
-                # Deduct quote currency (e.g., fiat)
-                self.balances[quote] -= total_cost
-
-                # Add base currency (e.g., token_1)
-                self.balances[base] += qty
-
-                # Track turnover and fees
-                self.turnover += total_cost
-                self.total_fees_paid += fee_amount
-                executed = True
-
-        elif side == "sell":
-            # Check if we have enough of the base currency
-            if self.balances[base] >= qty:
-                # Calculate proceeds after fee
-                base_proceeds = qty * price
-                fee_amount = base_proceeds * self.fee
-                net_proceeds = base_proceeds - fee_amount
-
-                # Add quote currency (e.g., fiat)
-                self.balances[quote] += net_proceeds
-
-                # Deduct base currency (e.g., token_1)
-                self.balances[base] -= qty
-
-                # Track turnover and fees
-                self.turnover += base_proceeds
-                self.total_fees_paid += fee_amount
-                executed = True
-
-        # Count successful trades
-        if executed:
-            self.trade_count += 1
-
-def score(solution: pd.DataFrame, submission: pd.DataFrame, row_id_column_name: str, fee: float, fiat_balance: float, token1_balance: float, token2_balance: float) -> float:
+from exchange._trader import PAIR_CODES, SIDE_CODES, Trader, equity_stats, initial_portfolio_value
+
+
+def score(solution: pd.DataFrame | pl.DataFrame, submission: pd.DataFrame | pl.DataFrame, row_id_column_name: str, fee: float, fiat_balance: float, token1_balance: float, token2_balance: float) -> float:
     """Score trading strategy"""
     # Initialize multi-asset trader
     trader = Trader()  # USD
@@ -168,37 +24,55 @@ def score(solution: pd.DataFrame, submission: pd.DataFrame, row_id_column_name:
     # Record initial balances for display
     initial_balances = trader.balances.copy()
 
-    # Initialize prices with first data point for each pair
-    solution.sort_values("timestamp", inplace=True)
-    first_prices = {k: df.iloc[0]['close'] for k, df in solution.groupby("symbol")}
-
-    # Calculate true initial portfolio value including all assets
-    initial_portfolio_value = initial_balances["fiat"]
-    if "token_1/fiat" in first_prices and initial_balances["token_1"] > 0:
-        initial_portfolio_value += initial_balances["token_1"] * first_prices["token_1/fiat"]
-    if "token_2/fiat" in first_prices and initial_balances["token_2"] > 0:
-        initial_portfolio_value += initial_balances["token_2"] * first_prices["token_2/fiat"]
-
-    # Start equity history with correct initial portfolio value
-    trader.equity_history = [initial_portfolio_value]
+    # Sort and group in Polars; pandas frames (the Kaggle metric API) are converted once
+    if isinstance(solution, pd.DataFrame):
+        solution = pl.from_pandas(solution[["timestamp", "symbol", "close"]])
+    if isinstance(submission, pd.DataFrame):
+        submission = pl.from_pandas(submission[["timestamp", "pair", "side", "qty"]])
+    solution = solution.sort("timestamp", maintain_order=True)
+
+    # Start equity history with a slot for the initial portfolio value, filled in
+    # after the loop from the first price of each pair the trader records
+    trader.equity_history = [0.0]
+
+    # Pull the columns used by the loop out as arrays once
+    ts_arr = solution["timestamp"].to_numpy()
+    symbol_arr = solution["symbol"].to_numpy()
+    close_arr = solution["close"].to_numpy()
+    # Rows are sorted, so each timestamp is a contiguous run starting where the value changes
+    starts = np.flatnonzero(np.r_[len(ts_arr) > 0, ts_arr[1:] != ts_arr[:-1]])
+    ends = np.r_[starts[1:], len(ts_arr)]
+    timestamps = ts_arr[starts]
+
+    # Submission rows for each timestamp, in file order
+    orders_by_ts = dict(
+        submission.with_row_index("row").group_by("timestamp").agg(pl.col("row")).iter_rows()
+    )
+    # Map pair/side strings to integer codes once; unknown sides become -1
+    order_pairs = submission["pair"].replace_strict(PAIR_CODES, return_dtype=pl.Int64).to_numpy()
+    order_sides = submission["side"].replace_strict(SIDE_CODES, default=-1, return_dtype=pl.Int64).to_numpy()
+    order_qtys = submission["qty"].cast(pl.Float64).to_numpy()
 
     # Process data timestamp by timestamp
-    for timestamp, group in solution.groupby('timestamp'):
-        for _, row in group.iterrows():
-            trader.update_market(row["symbol"], row.to_dict())
+    for timestamp, start, end in zip(timestamps, starts.tolist(), ends.tolist()):
+        for i in range(start, end):
+            trader.update_market(symbol_arr[i], close_arr[i])
 
         # Execute trades from submission file for timestamp
-        for _, row in submission[submission["timestamp"] == timestamp].iterrows():
-            trader.execute(row.to_dict())
+        for j in orders_by_ts.get(timestamp, ()):
+            trader.execute_codes(order_pairs[j], order_sides[j], order_qtys[j])
+
+    # Calculate true initial portfolio value including all assets
+    trader.equity_history[0] = initial_portfolio_value(initial_balances, trader.first_prices)
 
     # Calculate performance metrics
-    equity_curve = np.array(trader.equity_history)
-    rets = np.diff(equity_curve) / equity_curve[:-1]
+    equity_curve = np.array(trader.equity_history, dtype=np.float64)
+    sharpe_ratio, max_dd = equity_stats(equity_curve)
 
     # Return results
     res = {
-        "sharpe": sharpe(rets),
-        "max_dd": max_drawdown(equity_curve),
+        "sharpe": sharpe_ratio,
+        "max_dd": max_dd,
         "turnover": trader.turnover,
     }
 
@@ -220,6 +94,8 @@ def main(args: argparse.Namespace):
         print(f"Error: {args.data} file doesn't exist.")
         sys.exit(1)
 
+    # Parse with pandas, as the hosted metric does: its float parser can differ from
+    # Polars' by an ulp, which is enough to flip a qty <= balance check
     data_df = pd.read_csv(args.data)
 
     if not os.path.exists(args.submission):
@@ -1,137 +1,37 @@
 """CLI: python -m exchange.engine path/to/submission.tgz"""
-import argparse, importlib.util, time, tarfile, tempfile, sys, json, os
+import argparse, time, sys, json, os
 import uuid
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import polars as pl
 
-# --- Core Engine ---------------------------------------------------------
+from exchange._trader import Trader, initial_portfolio_value
+from exchange.engine import load_strategy, submission_dir
 
-class Trader:
-    """Trader supporting multiple trading pairs and currencies."""
+def uuid4_strings(n: int) -> list[str]:
+    """n random UUID4 strings from a single os.urandom read"""
+    raw = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
 
-    def __init__(self, balances, fee):
-        # Initialize balances for each currency
-        self.balances = balances
-        self.fee = fee
 
-        # Track market prices for each pair
-        self.prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
+def vectorized_actions(strat_mod, combined_data: pl.DataFrame) -> pd.DataFrame:
+    """Collect the actions of a strategy exposing ``vectorized(data)``.
 
-        # First and last prices for reporting
-        self.first_prices = {
-            "token_1/fiat": None,
-            "token_2/fiat": None,
-            "token_1/token_2": None
-        }
+    The strategy gets the whole market data frame, sorted by timestamp, and returns
+    a frame of timestamp/pair/side/qty rows; it must not depend on balances,
+    as insufficient-balance orders are only rejected when scoring.
+    """
+    actions = strat_mod.vectorized(combined_data.sort("timestamp", maintain_order=True))
+    if isinstance(actions, pd.DataFrame):
+        actions = pl.from_pandas(actions)
+
+    result = actions.select("timestamp", "pair", "side", "qty").sort("timestamp", maintain_order=True).to_pandas()
+    result.insert(0, "id", uuid4_strings(len(result)))
+    return result
 
-        # Store the first update timestamp for each pair
-        self.first_update = {
-            "token_1/fiat": False,
-            "token_2/fiat": False,
-            "token_1/token_2": False
-        }
 
-        # Track portfolio value history
-        self.equity_history = []
-        self.turnover = 0.0
-        self.trade_count = 0
-        self.total_fees_paid = 0.0  # Track total fees paid
-
-    def update_market(self, pair, price_data):
-        """Update market prices for a specific trading pair"""
-        # Store the updated price
-        self.prices[pair] = price_data["close"]
-
-        # Store first price for each pair (for reporting)
-        if not self.first_update[pair]:
-            self.first_prices[pair] = price_data["close"]
-            self.first_update[pair] = True
-
-        # Calculate total portfolio value (in fiat)
-        equity = self.calculate_portfolio_value()
-        self.equity_history.append(equity)
-
-    def calculate_portfolio_value(self):
-        """Calculate total portfolio value in fiat currency"""
-        value = self.balances["fiat"]
-
-        # Add token_1 value if we have price data
-        if self.prices["token_1/fiat"] is not None:
-            value += self.balances["token_1"] * self.prices["token_1/fiat"]
-
-        # Add token_2 value if we have price data
-        if self.prices["token_2/fiat"] is not None:
-            value += self.balances["token_2"] * self.prices["token_2/fiat"]
-        # If token_2/fiat price not available but token_1/fiat and token_1/token_2 are available
-        elif self.prices["token_1/fiat"] is not None and self.prices["token_1/token_2"] is not None:
-            token2_value_in_token1 = self.balances["token_2"] / self.prices["token_1/token_2"]
-            value += token2_value_in_token1 * self.prices["token_1/fiat"]
-
-        return value
-
-    def execute(self, order):
-        """Execute a trading order across any supported pair"""
-        pair = order["pair"]  # e.g., "token_1/fiat"
-        side = order["side"]  # "buy" or "sell"
-        qty = float(order["qty"])
-
-        # Split the pair into base and quote currencies
-        base, quote = pair.split("/")
-
-        # Get current price for the pair
-        price = self.prices[pair]
-        if price is None:
-            return  # Can't trade without a price
-
-        executed = False
-
-        if side == "buy":
-            # Calculate total cost including fee
-            base_cost = qty * price
-            fee_amount = base_cost * self.fee
-            total_cost = base_cost + fee_amount
-
-            # Check if we have enough of the quote currency
-            if self.balances[quote] >= total_cost:
-                # Deduct quote currency (e.g., fiat)
-                self.balances[quote] -= total_cost
-
-                # Add base currency (e.g., token_1)
-                self.balances[base] += qty
-
-                # Track turnover and fees
-                self.turnover += total_cost
-                self.total_fees_paid += fee_amount
-                executed = True
-
-        elif side == "sell":
-            # Check if we have enough of the base currency
-            if self.balances[base] >= qty:
-                # Calculate proceeds after fee
-                base_proceeds = qty * price
-                fee_amount = base_proceeds * self.fee
-                net_proceeds = base_proceeds - fee_amount
-
-                # Add quote currency (e.g., fiat)
-                self.balances[quote] += net_proceeds
-
-                # Deduct base currency (e.g., token_1)
-                self.balances[base] -= qty
-
-                # Track turnover and fees
-                self.turnover += base_proceeds
-                self.total_fees_paid += fee_amount
-                executed = True
-
-        # Count successful trades
-        if executed:
-            self.trade_count += 1
-
-def run_backtest(submission_dir: Path, combined_data: pd.DataFrame, fee: float, balances: dict[str, float]) -> pd.DataFrame:
+def run_backtest(submission_dir: Path, combined_data: pl.DataFrame, fee: float, balances: dict[str, float], strat_mod=None) -> pd.DataFrame:
     """Run a backtest with multiple trading pairs.
 
     Args:
@@ -139,57 +39,75 @@ def run_backtest(submission_dir: Path, combined_data: pd.DataFrame, fee: float,
         combined_data: DataFrame containing market data for multiple pairs
         fee: Trading fee (in basis points, e.g., 2 = 0.02%)
         balances: Dictionary of {pair: amount} containing initial balances
+        strat_mod: Optional already imported strategy module, used instead of
+            importing from submission_dir (e.g. across a parameter sweep)
     """
-    sys.path.insert(0, str(submission_dir))
-    strat_mod = importlib.import_module("strategy.main")
+    if strat_mod is None:
+        strat_mod = load_strategy(submission_dir)
+    return simulate(strat_mod, combined_data, fee, balances)
+
+
+def simulate(strat_mod, combined_data: pl.DataFrame, fee: float, balances: dict[str, float]) -> pd.DataFrame:
+    """Run a strategy module over the market data and collect its actions."""
+    # Strategies that decide from prices alone can emit every action in one call
+    if getattr(strat_mod, "VECTORIZABLE", False):
+        return vectorized_actions(strat_mod, combined_data)
 
     trader = Trader(balances, fee)
 
     # Record initial balances for display
     initial_balances = balances.copy()
 
-    # Initialize prices with first data point for each pair
-    combined_data.sort_values("timestamp", inplace=True)
-    first_prices = {k: df.iloc[0]['close'] for k, df in combined_data.groupby("symbol")}
+    combined_data = combined_data.sort("timestamp", maintain_order=True)
 
-    # Calculate true initial portfolio value including all assets
-    initial_portfolio_value = initial_balances["fiat"]
-    if "token_1/fiat" in first_prices and initial_balances["token_1"] > 0:
-        initial_portfolio_value += initial_balances["token_1"] * first_prices["token_1/fiat"]
-    if "token_2/fiat" in first_prices and initial_balances["token_2"] > 0:
-        initial_portfolio_value += initial_balances["token_2"] * first_prices["token_2/fiat"]
+    # The initial portfolio value is filled in after the loop, once the trader
+    # has recorded the first price of each pair
+    trader.equity_history = [0.0]
+
+    rows = []
+
+    # Pull the columns used by the loop out once; strategies still get one dict per
+    # row with every column of the data, built in a single pass
+    ts_arr = combined_data["timestamp"].to_numpy()
+    symbol_arr = combined_data["symbol"].to_numpy()
+    close_arr = combined_data["close"].to_numpy()
+    records = combined_data.to_dicts()
+    # Rows are sorted, so each timestamp is a contiguous run starting where the value changes
+    starts = np.flatnonzero(np.r_[len(ts_arr) > 0, ts_arr[1:] != ts_arr[:-1]])
+    ends = np.r_[starts[1:], len(ts_arr)]
+    timestamps = ts_arr[starts]
 
-    trader.equity_history = [initial_portfolio_value]
-    result = pd.DataFrame(
-        columns=["id", "timestamp", "pair", "side", "qty"],
-    )
+    # Live view of the balances, kept current by the trader's fills
+    balances_view = trader.balances
 
     # Process data timestamp by timestamp
-    for timestamp, group in combined_data.groupby('timestamp'):
+    for timestamp, start, end in zip(timestamps, starts.tolist(), ends.tolist()):
         # Update prices for each pair in this timestamp
+        # Add fee information to market data so strategies can access it
         market_data = {
             "fee": fee
         }
-        for _, row in group.iterrows():
-            pair = row['symbol']
-            data_dict = row.to_dict()
-            # Add fee information to market data so strategies can access it
-            market_data[pair] = data_dict
-            trader.update_market(pair, data_dict)
+        for i in range(start, end):
+            pair = symbol_arr[i]
+            market_data[pair] = records[i]
+            trader.update_market(pair, close_arr[i])
 
         # Get strategy decision based on all available market data and current balances
-        actions: list[dict] | None = strat_mod.on_data(market_data, balances)
+        actions: list[dict] | tuple[dict, ...] | None = strat_mod.on_data(market_data, balances_view)
 
         if actions is None:
             continue
 
-        # Add action dictionary to result DataFrame
+        # Collect actions and build the result DataFrame once at the end
         for action in actions:
             trader.execute(action)
-            action["timestamp"] = timestamp
-            action["id"] = str(uuid.uuid4())
-            result = pd.concat([result, pd.DataFrame([action])], ignore_index=True)
+            rows.append({**action, "timestamp": timestamp})
 
+    # Calculate true initial portfolio value including all assets
+    trader.equity_history[0] = initial_portfolio_value(initial_balances, trader.first_prices)
+
+    result = pd.DataFrame(rows, columns=["id", "timestamp", "pair", "side", "qty"])
+    result["id"] = uuid4_strings(len(result))
     return result
 
 
@@ -200,14 +118,12 @@ def main(args: argparse.Namespace):
         print(f"Error: {args.data} file doesn't exist.")
         sys.exit(1)
 
-    data_df = pd.read_csv(args.data)
-
-    with tempfile.TemporaryDirectory() as td:
-        with tarfile.open(args.submission) as tar:
-            tar.extractall(path=td)
+    # Parse with pandas so strategies see the same floats the scoring metric uses
+    data_df = pl.from_pandas(pd.read_csv(args.data))
 
+    with submission_dir(args.submission, cache=not args.no_cache) as submission_root:
         # Run backtest
-        res = run_backtest(Path(td) / "submission", data_df, args.fee / 10000, {
+        res = run_backtest(submission_root / "submission", data_df, args.fee / 10000, {
             "fiat": args.fiat_balance,
             "token_1": args.token1_balance,
             "token_2": args.token2_balance,
@@ -226,6 +142,7 @@ if __name__ == "__main__":
     p.add_argument("--token2_balance", help="Initial token_2 balance", type=float, default=0.0)
     p.add_argument("--fiat_balance", help="Initial fiat balance", type=float, default=10000.0)
     p.add_argument("--fee", help="Trading fee (in basis points, e.g., 3 = 0.03% = 0.0003)", type=float, default=3.0)
+    p.add_argument("--no-cache", help="Extract the submission into a temporary directory instead of the cache", action="store_true")
     args = p.parse_args()
 
     main(args)
\ No newline at end of file
@@ -1,5 +1,7 @@
 """Grabs Binance 1‑minute OHLCV via CCXT and saves as Parquet."""
-import ccxt
+import asyncio
+import ccxt.async_support as ccxt
+import numpy as np
 import pandas as pd
 import time
 import os
@@ -8,32 +10,87 @@ from datetime import datetime, timedelta, UTC
 from pyrate_limiter import Rate, Limiter
 
 ONE_MINUTE_IN_MILLIS = 60_000
+BATCH_MINUTES = 1000  # Binance caps klines per request at 1000
+MAX_CONCURRENT_REQUESTS = 8
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
 
-def fetch(symbol: str, start_ts: int, end_ts: int) -> pd.DataFrame:
-    """Fetch OHLCV between timestamps (inclusive) in milliseconds."""
-    exchange = ccxt.binance()
-    rate_limiter = Limiter(Rate(exchange.rateLimit, 1), max_delay=1000)
-    frames = []
-    since_ts = start_ts
-    while since_ts < end_ts:
+class CandleBuffer:
+    """Preallocated column arrays with one slot per minute in [start_ts, end_ts).
+
+    Batches are written in place as they arrive, so no per-batch frames are
+    kept and the final DataFrame wraps the arrays instead of concatenating.
+    """
+
+    def __init__(self, start_ts: int, end_ts: int):
+        self.start_ts = start_ts
+        n = (end_ts - start_ts) // ONE_MINUTE_IN_MILLIS
+        self.timestamps = np.empty(n, dtype=np.int64)
+        self.values = np.empty((len(OHLCV_COLUMNS), n), dtype=np.float64)
+        self.filled = np.zeros(n, dtype=bool)
+
+    def store(self, batch: list):
+        """Write [timestamp, open, high, low, close, volume] candles into their minute slots."""
+        if not batch:
+            return
+        candles = np.asarray(batch, dtype=np.float64)
+        timestamps = candles[:, 0].astype(np.int64)
+        slots = (timestamps - self.start_ts) // ONE_MINUTE_IN_MILLIS
+        self.timestamps[slots] = timestamps
+        self.values[:, slots] = candles[:, 1:].T
+        self.filled[slots] = True
+
+    def to_frame(self, symbol: str) -> pd.DataFrame:
+        # Minutes the exchange had no candle for are dropped
+        keep = slice(None) if self.filled.all() else self.filled
+        df = pd.DataFrame({"timestamp": pd.to_datetime(self.timestamps[keep], unit="ms")})
+        for name, column in zip(OHLCV_COLUMNS, self.values[:, keep]):
+            df[name] = column
+        df["symbol"] = symbol
+        return df
+
+async def fetch_batch(exchange, rate_limiter, semaphore, buffer: CandleBuffer, symbol: str, since_ts: int, limit_minutes: int):
+    """Fetch one window of at most BATCH_MINUTES candles starting at since_ts into buffer."""
+    async with semaphore:
         since_datetime = datetime.utcfromtimestamp(since_ts / 1000).strftime("%Y-%m-%d %H:%M:%S UTC")
         print(f"Fetching {symbol} market data from {since_datetime}...")
-        
+
+        # The limiter blocks while throttling, so keep it off the event loop
+        await asyncio.to_thread(rate_limiter.try_acquire, 'fetch_ohclv')
+        batch = await exchange.fetch_ohlcv(symbol, timeframe="1m", since=since_ts, limit=limit_minutes)
+
+    # Drop candles past the window (returned after gaps), they belong to the next one
+    window_end = since_ts + limit_minutes * ONE_MINUTE_IN_MILLIS
+    buffer.store([candle for candle in batch if since_ts <= candle[0] < window_end])
+
+async def fetch_async(symbol: str, start_ts: int, end_ts: int) -> pd.DataFrame:
+    """Fetch OHLCV between timestamps in milliseconds, windows in parallel."""
+    exchange = ccxt.binance()
+    rate_limiter = Limiter(Rate(exchange.rateLimit, 1), max_delay=1000)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    buffer = CandleBuffer(start_ts, end_ts)
+
+    # Windows are known up front, so every request can be issued at once
+    windows = []
+    for since_ts in range(start_ts, end_ts, BATCH_MINUTES * ONE_MINUTE_IN_MILLIS):
         remaining_minutes = (end_ts - since_ts) // ONE_MINUTE_IN_MILLIS
         if remaining_minutes == 0:
             break
-        limit_minutes = min(1000, remaining_minutes)
-        rate_limiter.try_acquire('fetch_ohclv')
-        batch = exchange.fetch_ohlcv(symbol, timeframe="1m", since=since_ts, limit=limit_minutes)
-        if not batch:
-            break
-        frames.append(pd.DataFrame(batch, columns=["timestamp", "open", "high", "low", "close", "volume"]))
+        windows.append((since_ts, min(BATCH_MINUTES, remaining_minutes)))
+
+    try:
+        await asyncio.gather(*(
+            fetch_batch(exchange, rate_limiter, semaphore, buffer, symbol, since_ts, limit_minutes)
+            for since_ts, limit_minutes in windows
+        ))
+    finally:
+        await exchange.close()
+
+    # Slots are in minute order, so the frame is already sorted by timestamp
+    return buffer.to_frame(symbol)
 
-        since_ts = batch[-1][0] + ONE_MINUTE_IN_MILLIS
-    df = pd.concat(frames, ignore_index=True)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-    df["symbol"] = symbol
-    return df
+def fetch(symbol: str, start_ts: int, end_ts: int) -> pd.DataFrame:
+    """Fetch OHLCV between timestamps (inclusive) in milliseconds."""
+    return asyncio.run(fetch_async(symbol, start_ts, end_ts))
 
 
 if __name__ == "__main__":
@@ -1,36 +1,48 @@
 import argparse
+import os
 import uuid
 
-import pandas as pd
+import polars as pl
+
+
+def uuid4_strings(n: int) -> list[str]:
+    """n random UUID4 strings from a single os.urandom read"""
+    raw = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
 
 
 def main(args: argparse.Namespace):
     """Merge multiple CSV files into one."""
 
-    # Read all CSV files into a list of DataFrames
-    dataframes = [pd.read_csv(file) for file in args.input_files]
+    # Read all CSV files into a list of DataFrames; symbols are few and repeated,
+    # so keep them categorical and rename the categories rather than every row
+    dataframes = [pl.read_csv(file, schema_overrides={"symbol": pl.Categorical}) for file in args.input_files]
 
     # Concatenate all DataFrames into one
-    merged_df = pd.concat(dataframes, ignore_index=True)
+    merged_df = pl.concat(dataframes, how="vertical_relaxed")
 
     # Rename real symbol names to generic names
-    merged_df["symbol"].replace(
-        {
-            f"{args.token1}/{args.fiat}": "token_1/fiat",
-            f"{args.token2}/{args.fiat}": "token_2/fiat",
-            f"{args.token1}/{args.token2}": "token_1/token_2",
-        },
-        inplace=True
+    merged_df = merged_df.with_columns(
+        pl.col("symbol").replace(
+            {
+                f"{args.token1}/{args.fiat}": "token_1/fiat",
+                f"{args.token2}/{args.fiat}": "token_2/fiat",
+                f"{args.token1}/{args.token2}": "token_1/token_2",
+            }
+        )
     )
 
-    merged_df["id"] = [str(uuid.uuid4()) for _ in range(len(merged_df))]
-    merged_df.set_index("id", inplace=True)
+    # Unique row ids as the first column
+    merged_df = merged_df.select(
+        pl.Series("id", uuid4_strings(merged_df.height)),
+        pl.all(),
+    )
 
     # Sort by timestamp
-    merged_df.sort_values(by="timestamp", inplace=True)
+    merged_df = merged_df.sort("timestamp", maintain_order=True)
 
     # Save the merged DataFrame to the output file
-    merged_df.to_csv(args.output, index=True)
+    merged_df.write_csv(args.output)
     print(f"Merged {len(dataframes)} files into {args.output}")
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 import argparse
 
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+USAGES = pa.array(["Public", "Private", "Ignored"])
 
 
 def main(args: argparse.Namespace):
@@ -13,18 +16,20 @@ def main(args: argparse.Namespace):
     assert round(args.public_ratio + args.private_ratio + args.ignored_ratio, 2) == 1., \
         "Public, Private and Ignored ratios must sum to 1."
 
-    # Read the test file
-    test_df = pd.read_csv(args.test_file)
+    # Read the test file (multithreaded Arrow reader)
+    test_table = pacsv.read_csv(args.test_file)
 
-    # Generate a random solution
-    test_df["Usage"] = np.random.choice(
-        ["Public", "Private", "Ignored"],
-        size=len(test_df),
+    # Generate a random solution: sample small integer indices, then map them to labels in Arrow
+    rng = np.random.default_rng(args.seed)
+    usage_idx = rng.choice(
+        len(USAGES),
+        size=test_table.num_rows,
         p=[args.public_ratio, args.private_ratio, args.ignored_ratio]
-    )
+    ).astype(np.int8)
+    test_table = test_table.append_column("Usage", USAGES.take(usage_idx))
 
-    # Save the solution to a CSV file
-    test_df.to_csv(args.output_file, index=False)
+    # Save the solution to a CSV file; values contain no delimiters, so leave them unquoted
+    pacsv.write_csv(test_table, args.output_file, write_options=pacsv.WriteOptions(quoting_style="none"))
     print(f"Solution saved to {args.output_file}")
 
 
@@ -35,6 +40,7 @@ if __name__ == "__main__":
     parser.add_argument("--public-ratio", type=float, default=0.3, help="Ratio of Public usage in the solution file.")
     parser.add_argument("--private-ratio", type=float, default=0.6, help="Ratio of Private usage in the solution file.")
     parser.add_argument("--ignored-ratio", type=float, default=0.1, help="Ratio of Ignored usage in the solution file.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for a reproducible split.")
     args = parser.parse_args()
 
     main(args)
\ No newline at end of file
@@ -1,9 +1,102 @@
 """Strategy entry point required by the exchange engine."""
-import importlib
-from pathlib import Path
+import math
+from collections import deque
+
+try:
+    from numba import njit
+except ImportError:  # Run the signal kernel as plain Python without numba
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 DEFAULT_FEE = 0.0003 # 3 bps = 0.0003 = 0.03%
 
+# token_1/token_2 arbitrage triggers when the pair trades this far off the implied cross rate
+ARB_LOW = 0.995
+ARB_HIGH = 1.005
+
+# Integer indices of the traded pairs, used for the per-tick lookups
+PAIR_T1F, PAIR_T2F, PAIR_T12 = 0, 1, 2
+_PAIR_NAMES = ("token_1/fiat", "token_2/fiat", "token_1/token_2")
+
+# Default strategy parameters, overridable per instance
+WINDOW = 30  # Window size for moving averages
+THRESHOLD = 2.0  # Volatility threshold for signals
+
+# Mean-reversion pairs, checked in order: (pair index, order qty, base currency)
+PAIRS_CONFIG = (
+    (PAIR_T1F, 0.01, "token_1"),
+    (PAIR_T2F, 0.1, "token_2"),
+)
+
+# Set to True and define vectorized(data) -> DataFrame of timestamp/pair/side/qty
+# to generate all trades in one call with exchange.trade; only valid for strategies
+# that ignore balances, and on_data is still required by exchange.engine
+VECTORIZABLE = False
+
+class RollingWindow:
+    """Fixed-size window of closes with running sum and sum of squares."""
+
+    __slots__ = ("size", "values", "count", "last", "total", "total_sq", "_until_resync")
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)  # append evicts the oldest close
+        self.count = 0
+        self.last = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._until_resync = size
+
+    def push(self, value):
+        value = float(value)
+        if self.count == self.size:
+            old = self.values[0]
+            self.total += value - old
+            self.total_sq += value * value - old * old
+        else:
+            self.count += 1
+            self.total += value
+            self.total_sq += value * value
+        self.values.append(value)
+        self.last = value
+
+        # Resync the running sums once per lap so rounding can't build up
+        self._until_resync -= 1
+        if not self._until_resync:
+            self._until_resync = self.size
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def exact_signal(self, price, threshold):
+        """band_signal from the values themselves, two-pass with fsum.
+
+        The running sums drift by a few ulps, which is enough to put the mean
+        off a flat window's price while the variance clamps to 0; use this to
+        confirm a signal they give.
+        """
+        mu = math.fsum(self.values) / self.count
+        band = threshold * math.sqrt(math.fsum((v - mu) ** 2 for v in self.values) / self.count)
+        if price < mu - band:
+            return 1
+        if price > mu + band:
+            return -1
+        return 0
+
+@njit(cache=True)
+def band_signal(price, total, total_sq, count, threshold):
+    """Mean-reversion signal of price against a window given by its running sums.
+
+    Returns 1 (buy) below mean - threshold * std, -1 (sell) above
+    mean + threshold * std, else 0; std is the population std (ddof=0).
+    """
+    mu = total / count
+    band = threshold * math.sqrt(max(0.0, total_sq / count - mu * mu))
+    if price < mu - band:
+        return 1
+    if price > mu + band:
+        return -1
+    return 0
+
 # Import the strategy implementation
 try:
     from .strategy import Strategy # type: ignore
@@ -11,21 +104,38 @@ try:
 except ImportError:
     # Fallback to a default implementation
     class DefaultStrategy:
-        def __init__(self):
-            self.initialized = False
+        __slots__ = (
+            "_window", "threshold", "pairs_config",
+            "initialized", "price_history", "_last_closes", "_arb_signal",
+        )
+
+        def __init__(self, window=WINDOW, threshold=THRESHOLD, pairs_config=PAIRS_CONFIG):
+            self.threshold = threshold
+            self.pairs_config = pairs_config
             
-            # Price history for each pair - this maintains state between calls
-            self.price_history = {
-                "token_1/fiat": [],
-                "token_2/fiat": [],
-                "token_1/token_2": []
-            }
+            # Last closes seen by the arbitrage check and the signal they gave
+            self._last_closes = None
+            self._arb_signal = 0
             
-            # Window size for moving averages
-            self.window = 30
+            # Also builds the price history
+            self.window = window
+        
+        @property
+        def window(self):
+            """Number of closes in each pair's rolling window"""
+            return self._window
+        
+        @window.setter
+        def window(self, window):
+            self._window = window
             
-            # Volatility threshold for signals
-            self.threshold = 2.0
+            # Price history for each pair - this maintains state between calls.
+            # Each pair keeps a ring buffer of the last `window` closes plus the
+            # running sum and sum of squares, so the stats are O(1) per tick.
+            # Indexed by PAIR_T1F / PAIR_T2F / PAIR_T12. The buffers are sized
+            # up front, so a new window starts them (and the warmup) over.
+            self.price_history = tuple(RollingWindow(window) for _ in _PAIR_NAMES)
+            self.initialized = False
     
         def on_data(self, market_data, balances):
             """Process market data and current balances to make trading decisions.
@@ -35,108 +145,116 @@ except ImportError:
                 balances: Dictionary of {currency: amount} containing current balances
             
             Returns:
-                Trading signal dict {pair, side, qty} or None
+                Tuple of trading signal dicts {pair, side, qty} or None
             """
+            # Look each pair's tick up once, then index by pair below
+            tick = (
+                market_data.get("token_1/fiat"),
+                market_data.get("token_2/fiat"),
+                market_data.get("token_1/token_2"),
+            )
+            
             # Update price history for each pair
-            for pair, data in market_data.items():
-                if pair in self.price_history:
-                    self.price_history[pair].append(data["close"])
-                    # Limit history length
-                    if len(self.price_history[pair]) > self.window:
-                        self.price_history[pair] = self.price_history[pair][-self.window:]
-            
-            # Wait until we have enough data points
-            for prices in self.price_history.values():
-                if len(prices) < self.window:
-                    return None
+            for prices, data in zip(self.price_history, tick):
+                if data is not None:
+                    prices.push(data["close"])
             
-            # Initialize flag for trading
+            # Wait until we have enough data points; windows never shrink, so once
+            # they are all full the check is skipped for the rest of the run
             if not self.initialized:
+                if any(prices.count < self._window for prices in self.price_history):
+                    return None
                 self.initialized = True
                 return None
             
-            import numpy as np
+            # Get fee from market_data if available, otherwise use default
+            fee_mult = 1.0 + market_data.get("fee", DEFAULT_FEE)
             
-            # Check for trading opportunities in token_1/fiat
-            if "token_1/fiat" in market_data:
-                prices = self.price_history["token_1/fiat"]
-                price = prices[-1]
-                mu, sigma = np.mean(prices), np.std(prices)
+            # Check for mean-reversion opportunities in each fiat pair
+            threshold = self.threshold
+            for idx, order_qty, base in self.pairs_config:
+                if tick[idx] is None:
+                    continue
+                prices = self.price_history[idx]
+                price = prices.last
+                signal = band_signal(price, prices.total, prices.total_sq, prices.count, threshold)
                 
-                if price < mu - self.threshold * sigma:
-                    # Buy token_1 with fiat if we have enough fiat
-                    qty = 0.01
-                    # Get fee from market_data if available, otherwise use default
-                    fee = market_data.get("fee", DEFAULT_FEE)
-                    required_fiat = qty * price * (1 + fee)
-                    if balances["fiat"] >= required_fiat:
-                        return [{"pair": "token_1/fiat", "side": "buy", "qty": qty}]
+                # Most ticks are inside the band: bail out before any balance lookup
+                if not signal:
+                    continue
                 
-                elif price > mu + self.threshold * sigma:
-                    # Sell token_1 for fiat if we have enough token_1
-                    qty = min(0.01, balances["token_1"])  # Adjust qty based on available balance
-                    if qty > 0:
-                        return [{"pair": "token_1/fiat", "side": "sell", "qty": qty}]
-            
-            # Check for trading opportunities in token_2/fiat
-            if "token_2/fiat" in market_data:
-                prices = self.price_history["token_2/fiat"]
-                price = prices[-1]
-                mu, sigma = np.mean(prices), np.std(prices)
+                # Rare enough to recheck without the running sums' rounding
+                signal = prices.exact_signal(price, threshold)
+                if not signal:
+                    continue
                 
-                if price < mu - self.threshold * sigma:
-                    # Buy token_2 with fiat if we have enough fiat
-                    qty = 0.1
-                    # Get fee from market_data if available, otherwise use default
-                    fee = market_data.get("fee", DEFAULT_FEE)
-                    required_fiat = qty * price * (1 + fee)
+                if signal == 1:
+                    # Buy the token with fiat if we have enough fiat
+                    qty = order_qty
+                    required_fiat = qty * price * fee_mult
                     if balances["fiat"] >= required_fiat:
-                        return [{"pair": "token_2/fiat", "side": "buy", "qty": qty}]
+                        return ({"pair": _PAIR_NAMES[idx], "side": "buy", "qty": qty},)
                 
-                elif price > mu + self.threshold * sigma:
-                    # Sell token_2 for fiat if we have enough token_2
-                    qty = min(0.1, balances["token_2"])  # Adjust qty based on available balance
-                    if qty > 0:
-                        return [{"pair": "token_2/fiat", "side": "sell", "qty": qty}]
+                else:
+                    # Sell the token for fiat if we have enough of it
+                    # Adjust qty based on available balance
+                    bal = balances[base]
+                    qty = order_qty if bal >= order_qty else bal
+                    if qty > 0.0:
+                        return ({"pair": _PAIR_NAMES[idx], "side": "sell", "qty": qty},)
             
             # Check for arbitrage opportunities with token_1/token_2
-            if all(pair in market_data for pair in ["token_1/fiat", "token_2/fiat", "token_1/token_2"]):
-                token1_price = market_data["token_1/fiat"]["close"]
-                token2_price = market_data["token_2/fiat"]["close"]
-                token1_token2_price = market_data["token_1/token_2"]["close"]
+            t1f, t2f, t12 = tick
+            if t1f is None or t2f is None or t12 is None:
+                return None
+            
+            token1_price = t1f["close"]
+            token2_price = t2f["close"]
+            token1_token2_price = t12["close"]
+            
+            # The price comparison only needs redoing when a close has moved;
+            # the balance checks below still run on every tick
+            closes = (token1_price, token2_price, token1_token2_price)
+            if closes != self._last_closes:
+                self._last_closes = closes
                 
                 # Calculate implied token_1/token_2 price
                 implied_token1_token2 = token1_price / token2_price
-                
-                # If actual token_1/token_2 price is significantly lower than implied
-                if token1_token2_price < implied_token1_token2 * 0.995:
-                    # Buy token_1 with token_2 (if we have token_2)
-                    qty_token1 = 0.01
-                    # Get fee from market_data if available, otherwise use default
-                    fee = market_data.get("fee", DEFAULT_FEE)
-                    required_token2 = qty_token1 * token1_token2_price * (1 + fee)
-                    if balances["token_2"] >= required_token2:
-                        return [{"pair": "token_1/token_2", "side": "buy", "qty": qty_token1}]
-                
-                # If actual token_1/token_2 price is significantly higher than implied
-                elif token1_token2_price > implied_token1_token2 * 1.005:
-                    # Sell token_1 for token_2 (if we have token_1)
-                    qty_token1 = min(0.01, balances["token_1"])  # Adjust qty based on available balance
-                    if qty_token1 > 0:
-                        return [{"pair": "token_1/token_2", "side": "sell", "qty": qty_token1}]
+                if token1_token2_price < implied_token1_token2 * ARB_LOW:
+                    self._arb_signal = 1
+                elif token1_token2_price > implied_token1_token2 * ARB_HIGH:
+                    self._arb_signal = -1
+                else:
+                    self._arb_signal = 0
+            arb_signal = self._arb_signal
+            
+            # No arbitrage signal is the common case
+            if not arb_signal:
+                return None
+            
+            # If actual token_1/token_2 price is significantly lower than implied
+            if arb_signal == 1:
+                # Buy token_1 with token_2 (if we have token_2)
+                qty_token1 = 0.01
+                required_token2 = qty_token1 * token1_token2_price * fee_mult
+                if balances["token_2"] >= required_token2:
+                    return ({"pair": "token_1/token_2", "side": "buy", "qty": qty_token1},)
+            
+            # If actual token_1/token_2 price is significantly higher than implied
+            else:
+                # Sell token_1 for token_2 (if we have token_1)
+                # Adjust qty based on available balance
+                bal = balances["token_1"]
+                qty_token1 = 0.01 if bal >= 0.01 else bal
+                if qty_token1 > 0.0:
+                    return ({"pair": "token_1/token_2", "side": "sell", "qty": qty_token1},)
             
             return None
     
     strategy = DefaultStrategy()
 
-def on_data(market_data, balances):
-    """API required by the exchange engine.
-    
-    Args:
-        market_data: Dictionary of {pair: tick_data} containing market data for each pair
-        balances: Dictionary of {currency: amount} containing current balances
-        
-    Returns:
-        List of trading signals in dict {pair, side, qty} or None
-    """
-    return strategy.on_data(market_data, balances)
\ No newline at end of file
+# API required by the exchange engine: on_data(market_data, balances) takes
+# {pair: tick_data} and {currency: amount} and returns a sequence (list or
+# tuple) of trading signals in dict {pair, side, qty} or None. Bound once here
+# so each call goes straight to the strategy's method.
+on_data = strategy.on_data
@@ -0,0 +1,131 @@
+import json
+import os
+import stat
+import sys
+import tarfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exchange import engine
+
+RESULTS = {"score": float("nan"), "trading": {"sharpe": np.float64("inf"), "trade_count": 0}, "prices": [float("-inf"), 1.5]}
+EXPECTED = {"score": None, "trading": {"sharpe": None, "trade_count": 0}, "prices": [None, 1.5]}
+
+
+def test_dump_json_writes_non_finite_as_null(monkeypatch):
+    monkeypatch.setattr(engine, "orjson", None)
+    assert json.loads(engine.dump_json(RESULTS)) == EXPECTED
+
+
+def test_dump_json_orjson_writes_the_same():
+    pytest.importorskip("orjson")
+    assert json.loads(engine.dump_json(RESULTS)) == EXPECTED
+
+
+def test_dump_json_leaves_input_untouched():
+    engine.dump_json(RESULTS)
+    assert np.isnan(RESULTS["score"])
+
+
+def test_trader_balances_view_tracks_fills():
+    trader = engine.Trader()
+    trader.balances = {"fiat": 1000.0, "token_1": 0.0, "token_2": 0.0}
+    trader.fee = 0.0
+    view = trader.balances
+    trader.set_price("token_1/fiat", 100.0)
+    trader.execute({"pair": "token_1/fiat", "side": "buy", "qty": 2.0})
+    assert trader.balances is view
+    assert view == {"fiat": 800.0, "token_1": 2.0, "token_2": 0.0}
+    with pytest.raises(TypeError):
+        view["fiat"] = 0.0
+
+
+def test_tick_is_a_full_mapping():
+    tick = engine.Tick("token_1/fiat", 0.0003)
+    tick.timestamp = pd.Timestamp("2025-05-01")
+    tick.open, tick.high, tick.low, tick.close, tick.volume = 1.0, 2.0, 0.5, 1.5, 10.0
+    expected = {
+        "timestamp": pd.Timestamp("2025-05-01"), "open": 1.0, "high": 2.0, "low": 0.5,
+        "close": 1.5, "volume": 10.0, "pair": "token_1/fiat", "fee": 0.0003,
+    }
+    assert dict(tick) == expected
+    assert dict(tick.items()) == expected
+    assert list(tick) == list(expected)
+    assert len(tick) == len(expected)
+    assert tick == expected
+    assert tick["pair"] == "token_1/fiat"
+    assert tick.get("symbol", "missing") == "missing"
+    assert "close" in tick and "symbol" not in tick
+    with pytest.raises(KeyError):
+        tick["symbol"]
+
+    snapshot = tick.copy()
+    tick.close = 3.0
+    assert snapshot["close"] == 1.5
+
+
+STRATEGY = """
+seen = []
+
+def on_data(market_data, balances):
+    seen.append({pair: tick.copy() for pair, tick in market_data.items()})
+"""
+
+
+def test_backtest_ticks_match_row_dicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    for name in [m for m in sys.modules if m == "strategy" or m.startswith("strategy.")]:
+        monkeypatch.delitem(sys.modules, name)
+    (tmp_path / "strategy").mkdir()
+    (tmp_path / "strategy" / "main.py").write_text(STRATEGY)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2025-05-01", periods=3, freq="min"),
+        "open": [1.0, 2.0, 3.0], "high": [1.0, 2.0, 3.0], "low": [1.0, 2.0, 3.0],
+        "close": [1.0, 2.0, 3.0], "volume": [5.0, 5.0, 5.0],
+    })
+    trader = engine.Trader({"fiat": 1000.0, "token_1": 0.0, "token_2": 0.0})
+    engine.run_backtest(tmp_path, {"token_1/fiat": df}, trader=trader)
+
+    seen = [step["token_1/fiat"] for step in sys.modules.pop("strategy.main").seen]
+    assert [tick["close"] for tick in seen] == [1.0, 2.0, 3.0]
+    assert all(isinstance(tick["timestamp"], pd.Timestamp) for tick in seen)
+    assert seen[0] == {**df.iloc[0].to_dict(), "pair": "token_1/fiat", "fee": engine.DEFAULT_FEE}
+
+
+def make_archive(tmp_path):
+    src = tmp_path / "src" / "submission" / "strategy"
+    src.mkdir(parents=True)
+    (src / "main.py").write_text("def on_data(market_data, balances):\n    return None\n")
+    archive = tmp_path / "sub.tgz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(tmp_path / "src" / "submission", arcname="submission")
+    return archive
+
+
+def test_extract_submission_reuses_and_evicts(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(engine, "SUBMISSION_CACHE", cache)
+    archive = make_archive(tmp_path)
+
+    target = engine.extract_submission(str(archive))
+    assert (target / "submission" / "strategy" / "main.py").is_file()
+    assert engine.extract_submission(str(archive)) == target
+    assert stat.S_IMODE(os.stat(cache).st_mode) == 0o700
+
+    stale = cache / "sub-stale"
+    stale.mkdir()
+    os.utime(stale, (0, 0))
+    engine.extract_submission(str(archive))
+    assert not stale.exists()
+    assert target.is_dir()
+
+
+def test_submission_dir_without_cache_cleans_up(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(engine, "SUBMISSION_CACHE", cache)
+    with engine.submission_dir(str(make_archive(tmp_path)), cache=False) as root:
+        assert (root / "submission" / "strategy" / "main.py").is_file()
+    assert not root.exists()
+    assert not cache.exists()
@@ -0,0 +1,42 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from exchange import score as score_mod
+
+BALANCES = dict(fiat_balance=1000.0, token1_balance=1.0, token2_balance=0.1)
+
+
+def write_fixture(tmp_path, n=50, seed=0):
+    """Market data and a submission with full-precision prices and quantities"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2025-05-01", periods=n, freq="min").astype(str)
+    t1 = 2000.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+    t2 = 60000.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+    data = pd.DataFrame({
+        "timestamp": np.repeat(timestamps, 3),
+        "symbol": np.tile(["token_1/fiat", "token_2/fiat", "token_1/token_2"], n),
+        "close": np.column_stack([t1, t2, t1 / t2]).ravel(),
+    })
+    submission = pd.DataFrame({
+        "id": np.arange(n),
+        "timestamp": timestamps,
+        "pair": rng.choice(["token_1/fiat", "token_2/fiat", "token_1/token_2"], n),
+        "side": rng.choice(["buy", "sell"], n),
+        "qty": rng.uniform(0.0, 0.05, n),
+    })
+    data_path, submission_path = tmp_path / "data.csv", tmp_path / "submission.csv"
+    data.to_csv(data_path, index=False, float_format="%.17g")
+    submission.to_csv(submission_path, index=False, float_format="%.17g")
+    return data_path, submission_path
+
+
+def test_cli_matches_score_on_pandas_frames(tmp_path, capsys):
+    data_path, submission_path = write_fixture(tmp_path)
+    args = argparse.Namespace(submission=str(submission_path), data=str(data_path), fee=3.0, **BALANCES)
+    score_mod.main(args)
+    cli_score = float(capsys.readouterr().out.removeprefix("score: "))
+
+    expected = score_mod.score(pd.read_csv(data_path), pd.read_csv(submission_path), "", 3.0, **BALANCES)
+    assert cli_score == expected
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from strategy.main import DefaultStrategy
+
+BALANCES = {"fiat": 1e9, "token_1": 1e6, "token_2": 1e6}
+
+
+def feed(strategy, t1_closes, t2_close=60000.0):
+    """Feed token_1/fiat closes with flat token_2 and a consistent cross rate"""
+    out = []
+    for close in t1_closes:
+        market_data = {
+            "fee": 0.0003,
+            "token_1/fiat": {"close": close},
+            "token_2/fiat": {"close": t2_close},
+            "token_1/token_2": {"close": close / t2_close},
+        }
+        out.append(strategy.on_data(market_data, BALANCES))
+    return out
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_flat_window_gives_no_signal(seed):
+    # A random walk leaves the running sums off by rounding before the price goes flat
+    rng = np.random.default_rng(seed)
+    walk = np.round(2000.0 + np.cumsum(rng.normal(0.0, 5.0, 2000)), 2)
+    strategy = DefaultStrategy()
+    window = strategy.window
+    actions = feed(strategy, [*walk, *[walk[-1]] * (3 * window)])
+    assert all(a is None for a in actions[len(walk) + window:])
+
+
+def test_constant_prices_give_no_signal():
+    strategy = DefaultStrategy()
+    assert all(a is None for a in feed(strategy, [2685.75] * (5 * strategy.window)))
+
+
+def test_window_can_be_overridden_per_instance():
+    strategy = DefaultStrategy()
+    strategy.window = 10
+    assert strategy.window == 10
+    assert all(prices.size == 10 for prices in strategy.price_history)
+
+    feed(strategy, [2000.0] * 10)
+    assert strategy.initialized
+    assert DefaultStrategy().window == 30
+
+
+def test_parameters_can_be_passed_to_the_constructor():
+    strategy = DefaultStrategy(window=5, threshold=1.0)
+    assert strategy.window == 5
+    assert strategy.threshold == 1.0
+    strategy.threshold = 3.0
+    assert strategy.threshold == 3.0
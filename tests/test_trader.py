@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from exchange._trader import Trader, equity_stats
+from exchange.score import score
+
+PAIRS = ["token_1/fiat", "token_2/fiat", "token_1/token_2"]
+BALANCES = {"fiat": 1000.0, "token_1": 0.5, "token_2": 0.02}
+FEE_BPS = 3.0
+
+
+class ReferenceTrader:
+    """The baseline dict-based trader, kept as the plain-Python reference"""
+
+    def __init__(self, balances, fee):
+        self.balances = dict(balances)
+        self.fee = fee
+        self.prices = dict.fromkeys(PAIRS)
+        self.equity_history = []
+        self.turnover = 0.0
+        self.trade_count = 0
+        self.total_fees_paid = 0.0
+        self.rejected = {"buy": 0, "sell": 0}
+
+    def update_market(self, pair, close):
+        self.prices[pair] = close
+        self.equity_history.append(self.portfolio_value())
+
+    def portfolio_value(self):
+        value = self.balances["fiat"]
+        if self.prices["token_1/fiat"] is not None:
+            value += self.balances["token_1"] * self.prices["token_1/fiat"]
+        if self.prices["token_2/fiat"] is not None:
+            value += self.balances["token_2"] * self.prices["token_2/fiat"]
+        elif self.prices["token_1/fiat"] is not None and self.prices["token_1/token_2"] is not None:
+            value += self.balances["token_2"] / self.prices["token_1/token_2"] * self.prices["token_1/fiat"]
+        return value
+
+    def execute(self, order):
+        pair, side, qty = order["pair"], order["side"], float(order["qty"])
+        base, quote = pair.split("/")
+        price = self.prices[pair]
+        if price is None:
+            return
+        notional = qty * price
+        fee_amount = notional * self.fee
+        if side == "buy" and self.balances[quote] >= notional + fee_amount:
+            self.balances[quote] -= notional + fee_amount
+            self.balances[base] += qty
+            self.turnover += notional + fee_amount
+        elif side == "sell" and self.balances[base] >= qty:
+            self.balances[quote] += notional - fee_amount
+            self.balances[base] -= qty
+            self.turnover += notional
+        else:
+            self.rejected[side] += 1
+            return
+        self.total_fees_paid += fee_amount
+        self.trade_count += 1
+
+
+def make_market(n=80, seed=0):
+    """Market data and a submission mixing affordable and oversized orders"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2025-05-01", periods=n, freq="min").astype(str)
+    t1 = 2000.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+    t2 = 60000.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+    solution = pd.DataFrame({
+        "timestamp": np.repeat(timestamps, 3),
+        "symbol": np.tile(PAIRS, n),
+        "close": np.column_stack([t1, t2, t1 / t2]).ravel(),
+    })
+    # Some orders exceed the balances and must be rejected
+    qty = np.where(rng.random(n) < 0.3, rng.uniform(1.0, 2.0, n), rng.uniform(0.0, 0.05, n))
+    submission = pd.DataFrame({
+        "timestamp": timestamps,
+        "pair": rng.choice(PAIRS, n),
+        "side": rng.choice(["buy", "sell"], n),
+        "qty": qty,
+    })
+    return solution, submission
+
+
+def run_reference(solution, submission):
+    trader = ReferenceTrader(BALANCES, FEE_BPS / 10000)
+    for timestamp, group in solution.groupby("timestamp", sort=True):
+        for row in group.itertuples():
+            trader.update_market(row.symbol, row.close)
+        for order in submission[submission["timestamp"] == timestamp].to_dict("records"):
+            trader.execute(order)
+    return trader
+
+
+def reference_score(trader, solution):
+    first = solution.groupby("symbol")["close"].first()
+    initial = BALANCES["fiat"] + BALANCES["token_1"] * first["token_1/fiat"] + BALANCES["token_2"] * first["token_2/fiat"]
+    equity = np.array([initial, *trader.equity_history])
+    rets = np.diff(equity) / equity[:-1]
+    sharpe = np.sqrt(365 * 24 * 60) * rets.mean() / (rets.std(ddof=1) + 1e-9)
+    cummax = np.maximum.accumulate(equity)
+    mdd = ((equity - cummax) / cummax).min()
+    return 0.7 * sharpe - 0.2 * abs(mdd) - 0.1 * (trader.turnover / 1e6)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_trader_matches_reference(seed):
+    solution, submission = make_market(seed=seed)
+    reference = run_reference(solution, submission)
+    # The fixture exercises fills and rejections on both sides
+    assert reference.trade_count and all(reference.rejected.values())
+
+    trader = Trader(BALANCES, FEE_BPS / 10000)
+    for timestamp, group in solution.groupby("timestamp", sort=True):
+        for row in group.itertuples():
+            trader.update_market(row.symbol, row.close)
+        for order in submission[submission["timestamp"] == timestamp].to_dict("records"):
+            trader.execute(order)
+
+    assert trader.trade_count == reference.trade_count
+    assert trader.turnover == pytest.approx(reference.turnover, rel=1e-12)
+    assert trader.total_fees_paid == pytest.approx(reference.total_fees_paid, rel=1e-12)
+    assert trader.balances == pytest.approx(reference.balances, rel=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_score_matches_reference(seed):
+    solution, submission = make_market(seed=seed)
+    expected = reference_score(run_reference(solution, submission), solution)
+    result = score(solution, submission, "", FEE_BPS, BALANCES["fiat"], BALANCES["token_1"], BALANCES["token_2"])
+    assert result == pytest.approx(expected, rel=1e-9)
+
+
+def test_unknown_side_and_unpriced_pair_are_ignored():
+    trader = Trader(BALANCES, FEE_BPS / 10000)
+    trader.execute({"pair": "token_1/fiat", "side": "buy", "qty": 0.1})  # no price yet
+    trader.update_market("token_1/fiat", 2000.0)
+    trader.execute({"pair": "token_1/fiat", "side": "hold", "qty": 0.1})
+    assert trader.trade_count == 0
+    assert trader.balances == BALANCES
+
+
+def test_equity_stats_matches_numpy():
+    rng = np.random.default_rng(1)
+    equity = 1e6 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, 500)))
+    rets = np.diff(equity) / equity[:-1]
+    cummax = np.maximum.accumulate(equity)
+
+    sharpe, mdd = equity_stats(equity)
+    assert sharpe == pytest.approx(np.sqrt(365 * 24 * 60) * rets.mean() / (rets.std(ddof=1) + 1e-9), rel=1e-9)
+    assert mdd == pytest.approx(((equity - cummax) / cummax).min(), rel=1e-12)
+
+    # float32 storage (the engine's curve) is accumulated in float64
+    sharpe32, mdd32 = equity_stats(equity.astype(np.float32))
+    assert sharpe32 == pytest.approx(sharpe, rel=1e-3)
+    assert mdd32 == pytest.approx(mdd, rel=1e-3)
+
+
+def test_incremental_equity_matches_full_recompute():
+    solution, submission = make_market(seed=4)
+    reference = ReferenceTrader(BALANCES, FEE_BPS / 10000)
+    trader = Trader(BALANCES, FEE_BPS / 10000)
+    # token_2/fiat arrives late so the first ticks value token_2 through the cross
+    solution = solution[~((solution["symbol"] == "token_2/fiat") & (solution.index < 30))]
+    orders = submission.set_index("timestamp")
+    for row in solution.itertuples():
+        reference.update_market(row.symbol, row.close)
+        trader.update_market(row.symbol, row.close)
+        assert trader.equity == pytest.approx(reference.portfolio_value(), rel=1e-12)
+        if row.symbol == "token_1/token_2" and row.timestamp in orders.index:
+            order = orders.loc[row.timestamp].to_dict()
+            reference.execute(order)
+            trader.execute(order)
+            assert trader.equity == pytest.approx(reference.portfolio_value(), rel=1e-12)
+    assert trader.equity_history == pytest.approx(reference.equity_history, rel=1e-12)